@@ -0,0 +1,61 @@
+"""Admission control for expensive pipeline runs.
+
+A single Ollama box can only work through so much at once. Runs beyond
+``max_active`` wait in a bounded queue (for at most the request's remaining
+deadline); beyond that they are rejected so callers can retry later
+instead of piling up.
+
+``max_active`` is enforced host-wide through app.host_slots, so it holds
+under ``uvicorn --workers N``; ``max_queued`` is per worker process.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+
+from app.deadline import DeadlineExceeded, remaining
+from app.host_slots import HostSlots
+
+# Queued runs check for a free slot this often (seconds)
+POLL_INTERVAL = 0.25
+
+
+class AdmissionRejected(Exception):
+    pass
+
+
+class AdmissionController:
+    def __init__(self, name: str, max_active: int, max_queued: int):
+        self.max_active = max_active
+        self.max_queued = max_queued
+        # Counts for this worker; the slots themselves are shared by all workers
+        self.active = 0
+        self.queued = 0
+        self._slots = HostSlots(name, max_active)
+
+    def stats(self) -> dict:
+        return {
+            "active": self.active,
+            "queued": self.queued,
+            "max_active": self.max_active,
+            "max_queued": self.max_queued,
+        }
+
+    @asynccontextmanager
+    async def admit(self):
+        fd = self._slots.try_acquire()
+        if fd is None:
+            if self.queued >= self.max_queued:
+                raise AdmissionRejected("Too many runs in progress")
+            self.queued += 1
+            try:
+                fd = await self._slots.acquire(timeout=remaining(3600), poll=POLL_INTERVAL)
+            except (asyncio.TimeoutError, DeadlineExceeded):
+                raise AdmissionRejected("Timed out waiting for capacity")
+            finally:
+                self.queued -= 1
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._slots.release(fd)
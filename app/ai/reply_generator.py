@@ -1,12 +1,17 @@
 import ast
 import json
 import re
+from functools import lru_cache
 from typing import Optional
 
 import httpx
 
 from app.ai.prompts import PERSONA
+from app.ai.scheduler import INTERACTIVE, get_llm_scheduler
+from app.ai.tokens import estimate_tokens, smart_truncate
 from app.config import settings
+from app.deadline import remaining
+from app.singleflight import SingleFlight
 
 SYSTEM = """{persona}
 
@@ -19,11 +24,19 @@ Write {num_suggestions} distinct comment(s). Tone: {tone}.
 {context_section}
 Reply with JSON: {{"comments": ["comment1", "comment2"]}}"""
 
+# Generation stops as soon as the comments array closes; the parser restores it
+STOP_SEQUENCES = ["]}", "]\n}"]
+JSON_CLOSE = "]}"
+# Slack for chat-template tokens and estimate error
+CTX_MARGIN = 64
+CONTEXT_MAX_TOKENS = 64
+
 
 class ReplyGenerator:
     def __init__(self):
         self.base_url = settings.ollama_base_url
         self.model = settings.ollama_model
+        self._inflight = SingleFlight()
 
     async def generate_replies(
         self,
@@ -31,20 +44,45 @@ class ReplyGenerator:
         num_suggestions: int = 3,
         tone: str = "professional",
         user_context: Optional[str] = None,
+        priority: str = INTERACTIVE,
     ) -> list[str]:
         context_section = ""
         if user_context:
-            context_section = f"Context about me: {user_context}"
+            context_section = f"Context about me: {smart_truncate(user_context, CONTEXT_MAX_TOKENS)}"
 
         system = SYSTEM.format(persona=PERSONA)
+        num_predict = settings.reply_tokens_per_suggestion * num_suggestions + 16
+        template = USER.format(
+            post_text="",
+            num_suggestions=num_suggestions,
+            tone=tone,
+            context_section=context_section,
+        )
+        # num_ctx stays fixed (changing it makes Ollama reload the model), so
+        # the post gets whatever the window leaves after everything else
+        post_budget = min(
+            settings.reply_max_post_tokens,
+            settings.ollama_num_ctx - estimate_tokens(system + template) - num_predict - CTX_MARGIN,
+        )
         user_msg = USER.format(
-            post_text=post_text[:500],
+            post_text=smart_truncate(post_text, max(post_budget, 32)),
             num_suggestions=num_suggestions,
             tone=tone,
             context_section=context_section,
         )
 
-        async with httpx.AsyncClient(timeout=120) as client:
+        # Identical prompts already in flight share one Ollama call, queued
+        # at the priority of whoever asked first
+        replies = await self._inflight.do(
+            (self.model, system, user_msg), self._chat, system, user_msg, num_predict, priority
+        )
+        return list(replies)
+
+    async def _chat(self, system: str, user_msg: str, num_predict: int, priority: str) -> list[str]:
+        async with (
+            get_llm_scheduler().slot(priority, cost=num_predict),
+            httpx.AsyncClient(timeout=remaining(120)) as client,
+        ):
             resp = await client.post(
                 f"{self.base_url}/api/chat",
                 json={
@@ -55,6 +93,11 @@ class ReplyGenerator:
                     ],
                     "stream": False,
                     "format": "json",
+                    "options": {
+                        "num_ctx": settings.ollama_num_ctx,
+                        "num_predict": num_predict,
+                        "stop": STOP_SEQUENCES,
+                    },
                 },
             )
             resp.raise_for_status()
@@ -75,9 +118,13 @@ class ReplyGenerator:
             parsed = json.loads(cleaned)
         except json.JSONDecodeError:
             try:
-                parsed = ast.literal_eval(cleaned)
-            except Exception:
-                pass
+                # Output cut at a stop sequence is missing its closing "]}"
+                parsed = json.loads(cleaned + JSON_CLOSE)
+            except json.JSONDecodeError:
+                try:
+                    parsed = ast.literal_eval(cleaned)
+                except Exception:
+                    pass
 
         if parsed is None:
             # Last resort: extract any quoted string that looks like a comment
@@ -115,3 +162,9 @@ class ReplyGenerator:
                 return values
 
         return [str(parsed)]
+
+
+@lru_cache(maxsize=1)
+def get_reply_generator() -> ReplyGenerator:
+    """Shared generator, created on first use rather than at import time."""
+    return ReplyGenerator()
@@ -0,0 +1,167 @@
+"""Priority-aware scheduling of Ollama calls.
+
+Every model call (reply generation and triage) takes a slot from one shared
+scheduler sized to what the Ollama backend runs in parallel. Waiting calls
+are queued per priority class and dispatched by weighted fair queuing, so a
+dashboard user's "generate" jumps ahead of a long batch without starving it.
+
+Fair queuing orders calls within one worker process. Under ``--workers N``
+a call also takes a host-wide slot (app.host_slots), so the backend still
+sees at most ``ollama_max_concurrency`` calls; interactive calls poll for
+those slots more often, so they tend to win a freed slot over batch work
+waiting in other workers.
+"""
+
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+
+from app.config import settings
+from app.deadline import DeadlineExceeded, remaining
+from app.host_slots import HostSlots
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+PREFETCH = "prefetch"
+
+# Longest a call without a request deadline waits for a slot
+QUEUE_TIMEOUT = 300.0
+# Seconds between attempts at a host-wide slot held by another worker
+HOST_POLL = {INTERACTIVE: 0.02, BATCH: 0.1, PREFETCH: 0.25}
+
+
+@dataclass
+class ClassStats:
+    queued: int = 0
+    max_queued: int = 0
+    dispatched: int = 0
+    timed_out: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+    def record_wait(self, seconds: float) -> None:
+        self.dispatched += 1
+        self.total_wait += seconds
+        self.max_wait = max(self.max_wait, seconds)
+
+    def as_dict(self) -> dict:
+        return {
+            "queued": self.queued,
+            "max_queued": self.max_queued,
+            "dispatched": self.dispatched,
+            "timed_out": self.timed_out,
+            "mean_wait_s": self.total_wait / self.dispatched if self.dispatched else None,
+            "max_wait_s": self.max_wait,
+        }
+
+
+@dataclass
+class _Waiter:
+    future: asyncio.Future
+    start_tag: float
+    finish_tag: float
+
+
+class LLMScheduler:
+    def __init__(self, max_concurrency: int, weights: dict[str, float], host_slots: Optional[HostSlots] = None):
+        self.max_concurrency = max_concurrency
+        self.weights = weights
+        self.host_slots = host_slots
+        self.active = 0
+        self._queues: dict[str, deque[_Waiter]] = {cls: deque() for cls in weights}
+        # Start-time fair queuing: each call is tagged on arrival with a
+        # virtual finish time (cost / weight after its class's previous call,
+        # or after the current virtual time if the class was idle), and the
+        # smallest tag goes next. An idle class can't bank credit.
+        self._finish: dict[str, float] = {cls: 0.0 for cls in weights}
+        self._vtime = 0.0
+        self._stats = {cls: ClassStats() for cls in weights}
+
+    def stats(self) -> dict:
+        return {
+            "active": self.active,
+            "max_concurrency": self.max_concurrency,
+            "host_wide": self.host_slots is not None,
+            "weights": self.weights,
+            "classes": {cls: s.as_dict() for cls, s in self._stats.items()},
+        }
+
+    @asynccontextmanager
+    async def slot(self, priority: str = INTERACTIVE, cost: float = 1.0):
+        """Hold one backend slot; ``cost`` is the expected work (e.g. tokens to generate)."""
+        if priority not in self._queues:
+            raise ValueError(f"Unknown priority class: {priority}")
+        stats = self._stats[priority]
+        start = time.monotonic()
+
+        start_tag, finish_tag = self._tag(priority, cost)
+        if self.active < self.max_concurrency and not any(self._queues.values()):
+            self._vtime = start_tag
+            self.active += 1
+        else:
+            waiter = _Waiter(asyncio.get_running_loop().create_future(), start_tag, finish_tag)
+            self._queues[priority].append(waiter)
+            stats.queued += 1
+            stats.max_queued = max(stats.max_queued, stats.queued)
+            try:
+                await asyncio.wait_for(asyncio.shield(waiter.future), timeout=remaining(QUEUE_TIMEOUT))
+            except (asyncio.TimeoutError, asyncio.CancelledError, DeadlineExceeded) as e:
+                if waiter.future.done():
+                    # Dispatched just as we gave up; hand the slot on
+                    self._release()
+                else:
+                    waiter.future.cancel()
+                    self._queues[priority].remove(waiter)
+                    stats.queued -= 1
+                stats.timed_out += not isinstance(e, asyncio.CancelledError)
+                if isinstance(e, asyncio.TimeoutError):
+                    raise DeadlineExceeded("Timed out waiting for the model") from e
+                raise
+
+        fd = None
+        if self.host_slots is not None:
+            try:
+                budget = remaining(max(QUEUE_TIMEOUT - (time.monotonic() - start), 0))
+                fd = await self.host_slots.acquire(budget, HOST_POLL.get(priority, 0.1))
+            except (asyncio.TimeoutError, asyncio.CancelledError, DeadlineExceeded) as e:
+                self._release()
+                stats.timed_out += not isinstance(e, asyncio.CancelledError)
+                if isinstance(e, asyncio.TimeoutError):
+                    raise DeadlineExceeded("Timed out waiting for the model") from e
+                raise
+        stats.record_wait(time.monotonic() - start)
+
+        try:
+            yield
+        finally:
+            if fd is not None:
+                self.host_slots.release(fd)
+            self._release()
+
+    def _tag(self, priority: str, cost: float) -> tuple[float, float]:
+        start = max(self._finish[priority], self._vtime)
+        self._finish[priority] = start + cost / self.weights[priority]
+        return start, self._finish[priority]
+
+    def _release(self) -> None:
+        self.active -= 1
+        while self.active < self.max_concurrency and any(self._queues.values()):
+            cls = min((c for c, q in self._queues.items() if q), key=lambda c: self._queues[c][0].finish_tag)
+            waiter = self._queues[cls].popleft()
+            self._stats[cls].queued -= 1
+            self._vtime = waiter.start_tag
+            self.active += 1
+            waiter.future.set_result(None)
+
+
+@lru_cache(maxsize=1)
+def get_llm_scheduler() -> LLMScheduler:
+    return LLMScheduler(
+        settings.ollama_max_concurrency,
+        settings.llm_priority_weights,
+        HostSlots("ollama", settings.ollama_max_concurrency),
+    )
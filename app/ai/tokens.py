@@ -0,0 +1,64 @@
+"""Token budgeting helpers for prompts.
+
+Token counts are estimated (about 4 characters per token for English with
+Llama-family tokenizers), which is close enough for sizing budgets without
+loading a tokenizer.
+"""
+
+import math
+import re
+
+CHARS_PER_TOKEN = 4
+ELLIPSIS = " […] "
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+|\n+")
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _cut_words(text: str, max_tokens: int) -> str:
+    limit = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text
+    cut = text[:limit].rsplit(" ", 1)[0]
+    return cut or text[:limit]
+
+
+def smart_truncate(text: str, max_tokens: int, head_share: float = 0.6) -> str:
+    """Fit ``text`` into ``max_tokens`` keeping whole sentences from both ends.
+
+    Posts open with the hook and close with the takeaway, so the middle is
+    what gets dropped. A single sentence longer than the budget is cut at a
+    word boundary.
+    """
+    text = text.strip()
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    sentences = [s for s in _SENTENCE_RE.split(text) if s.strip()]
+    budget = max_tokens - estimate_tokens(ELLIPSIS)
+    head_budget = int(budget * head_share)
+
+    head, used = [], 0
+    for s in sentences:
+        cost = estimate_tokens(s) + 1
+        if used + cost > head_budget:
+            break
+        head.append(s)
+        used += cost
+    if not head:
+        return _cut_words(sentences[0], max_tokens)
+
+    tail = []
+    for s in reversed(sentences[len(head):]):
+        cost = estimate_tokens(s) + 1
+        if used + cost > budget:
+            break
+        tail.insert(0, s)
+        used += cost
+
+    if len(head) + len(tail) == len(sentences):
+        return " ".join(head + tail)
+    return " ".join(head) + (ELLIPSIS + " ".join(tail) if tail else ELLIPSIS.rstrip())
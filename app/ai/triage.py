@@ -0,0 +1,105 @@
+"""Cheap first tier of the reply cascade.
+
+A small, fast model scores each post for topic fit and whether it is worth
+replying to, so only promising posts reach the full persona generator.
+Triage failures let the post through rather than silently dropping it.
+"""
+
+import json
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+
+import httpx
+
+from app.ai.scheduler import BATCH, get_llm_scheduler
+from app.config import settings
+from app.deadline import remaining
+
+SYSTEM = """You screen LinkedIn posts for a quant/crypto/trading founder deciding where to comment.
+Score 0-10: 10 = on-topic with substance worth a sharp reply; 0 = off-topic, spam, hiring ads, or engagement bait.
+Reply with JSON only: {"score": <0-10>, "reason": "<5 words>"}"""
+
+USER = """Topic: {topic}
+Post: "{post_text}\""""
+
+
+@dataclass
+class TriageResult:
+    score: float
+    passed: bool
+    reason: str = ""
+
+
+@dataclass
+class TierStats:
+    calls: int = 0
+    passed: int = 0
+    errors: int = 0
+    total_seconds: float = 0.0
+
+    def record(self, seconds: float, passed: bool = True, error: bool = False) -> None:
+        self.calls += 1
+        self.passed += passed
+        self.errors += error
+        self.total_seconds += seconds
+
+    def as_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "passed": self.passed,
+            "errors": self.errors,
+            "pass_rate": self.passed / self.calls if self.calls else None,
+            "mean_latency_s": self.total_seconds / self.calls if self.calls else None,
+        }
+
+
+# Per-tier counters for the auto pipeline
+cascade_stats = {"triage": TierStats(), "generate": TierStats()}
+
+
+class TriageModel:
+    def __init__(self):
+        self.base_url = settings.ollama_base_url
+        self.model = settings.triage_model
+        self.threshold = settings.triage_threshold
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.model)
+
+    async def score(self, post_text: str, topic: str) -> TriageResult:
+        start = time.perf_counter()
+        try:
+            async with (
+                get_llm_scheduler().slot(BATCH, cost=settings.triage_num_predict),
+                httpx.AsyncClient(timeout=remaining(30)) as client,
+            ):
+                resp = await client.post(
+                    f"{self.base_url}/api/chat",
+                    json={
+                        "model": self.model,
+                        "messages": [
+                            {"role": "system", "content": SYSTEM},
+                            {"role": "user", "content": USER.format(topic=topic, post_text=post_text[:600])},
+                        ],
+                        "stream": False,
+                        "format": "json",
+                        "options": {"num_predict": settings.triage_num_predict, "temperature": 0},
+                    },
+                )
+                resp.raise_for_status()
+                parsed = json.loads(resp.json()["message"]["content"])
+            score = float(parsed.get("score", 0))
+            result = TriageResult(score=score, passed=score >= self.threshold, reason=str(parsed.get("reason", "")))
+        except Exception as e:
+            cascade_stats["triage"].record(time.perf_counter() - start, passed=True, error=True)
+            return TriageResult(score=-1, passed=True, reason=f"triage failed: {e}")
+
+        cascade_stats["triage"].record(time.perf_counter() - start, passed=result.passed)
+        return result
+
+
+@lru_cache(maxsize=1)
+def get_triage_model() -> TriageModel:
+    return TriageModel()
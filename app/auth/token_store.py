@@ -1,8 +1,9 @@
-import json
 import time
 from pathlib import Path
 from typing import Optional
 
+from app.storage import json_store
+
 STORE_DIR = Path.home() / ".linkedin-tool"
 STORE_PATH = STORE_DIR / "tokens.json"
 
@@ -11,33 +12,29 @@ class TokenStore:
     def __init__(self, path: Path = STORE_PATH):
         self.path = path
 
-    def save_token(self, token_data: dict) -> None:
-        self.path.parent.mkdir(parents=True, exist_ok=True)
+    async def save_token(self, token_data: dict) -> None:
         # Compute absolute expiry time
         if "expires_in" in token_data and "expires_at" not in token_data:
             token_data["expires_at"] = time.time() + token_data["expires_in"]
-        self.path.write_text(json.dumps(token_data, indent=2))
+        await json_store.write(self.path, token_data)
 
-    def load_token(self) -> Optional[dict]:
-        if not self.path.exists():
-            return None
-        return json.loads(self.path.read_text())
+    async def load_token(self) -> Optional[dict]:
+        return await json_store.read(self.path)
 
-    def is_token_expired(self) -> bool:
-        data = self.load_token()
+    async def is_token_expired(self) -> bool:
+        data = await self.load_token()
         if not data or "expires_at" not in data:
             return True
         return time.time() >= data["expires_at"]
 
-    def get_valid_token(self) -> Optional[str]:
-        if self.is_token_expired():
+    async def get_valid_token(self) -> Optional[str]:
+        data = await self.load_token()
+        if not data or "expires_at" not in data or time.time() >= data["expires_at"]:
             return None
-        data = self.load_token()
-        return data.get("access_token") if data else None
+        return data.get("access_token")
 
-    def clear(self) -> None:
-        if self.path.exists():
-            self.path.unlink()
+    async def clear(self) -> None:
+        await json_store.delete(self.path)
 
 
 token_store = TokenStore()
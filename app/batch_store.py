@@ -0,0 +1,162 @@
+"""Server-side storage for batch runs.
+
+Each run is one JSON document under RUNS_DIR holding its parameters,
+status and items. Items are appended as the pipeline finishes them, so a
+run can be paged through, and its items posted, regenerated or discarded,
+without rerunning discovery and generation.
+
+A running run is only held in memory by the worker process executing it,
+which rewrites the whole document as items arrive. Item actions are
+therefore refused (ItemConflict) until the run has finished; otherwise a
+change made through another worker would be overwritten.
+"""
+
+import asyncio
+import copy
+import secrets
+import time
+from pathlib import Path
+from typing import Optional
+
+from app.storage import json_store
+
+RUNS_DIR = Path.home() / ".linkedin-tool" / "runs"
+MAX_RUNS = 50
+
+
+class RunNotFound(KeyError):
+    pass
+
+
+class ItemConflict(Exception):
+    """The item's status doesn't allow the requested action."""
+
+
+class BatchStore:
+    def __init__(self):
+        # Runs this process is still writing; everything else is read from disk
+        self._live: dict[str, dict] = {}
+
+    def _path(self, run_id: str) -> Path:
+        if not run_id.isalnum():
+            raise RunNotFound(run_id)
+        return RUNS_DIR / f"{run_id}.json"
+
+    def _save(self, run: dict) -> None:
+        # Snapshot, since the live dict keeps changing while the write is queued
+        json_store.write(self._path(run["id"]), copy.deepcopy(run))
+
+    async def create(self, params: dict) -> dict:
+        run = {
+            "id": secrets.token_hex(8),
+            "created_at": time.time(),
+            "status": "running",
+            "params": params,
+            "items": [],
+        }
+        self._live[run["id"]] = run
+        self._save(run)
+        await self._prune()
+        return run
+
+    async def get(self, run_id: str) -> dict:
+        run = self._live.get(run_id) or await json_store.read(self._path(run_id))
+        if not run:
+            raise RunNotFound(run_id)
+        return run
+
+    async def get_item(self, run_id: str, item_id: str) -> dict:
+        return _find_item(await self.get(run_id), item_id)
+
+    async def append_item(self, run_id: str, item: dict) -> dict:
+        run = await self.get(run_id)
+        status = "posted" if item.get("posted") else "ready"
+        item = {"id": str(len(run["items"])), "status": status, **item}
+        run["items"].append(item)
+        self._save(run)
+        return item
+
+    async def finish(self, run_id: str, status: str = "done", **extra) -> None:
+        run = await self.get(run_id)
+        run.update(status=status, finished_at=time.time(), **extra)
+        await self._save_now(run)
+        self._live.pop(run_id, None)
+
+    async def update_item(self, run_id: str, item_id: str, expect: Optional[set[str]] = None, **changes) -> dict:
+        """Apply ``changes``; with ``expect``, only if the item's status is one of those.
+
+        The read, check and write happen under the run file's lock, so setting
+        e.g. status="posting" claims the item against concurrent actions from
+        any worker process.
+        """
+        if run_id in self._live:
+            raise ItemConflict("Run is still running")
+
+        def apply(run: Optional[dict]) -> dict:
+            if not run:
+                raise RunNotFound(run_id)
+            if run["status"] == "running":
+                raise ItemConflict("Run is still running")
+            item = _find_item(run, item_id)
+            if expect is not None and item["status"] not in expect:
+                raise ItemConflict(f"Item is {item['status']}")
+            item.update(changes)
+            return run
+
+        run = await json_store.update(self._path(run_id), apply)
+        return _find_item(run, item_id)
+
+    async def page(
+        self, run_id: str, cursor: Optional[str] = None, limit: int = 20, include_discarded: bool = False
+    ) -> tuple[list[dict], Optional[str]]:
+        """Items after ``cursor`` (an item id), and the cursor for the next page."""
+        run = await self.get(run_id)
+        start = int(cursor) + 1 if cursor and cursor.isdigit() else 0
+        page, next_cursor = [], None
+        for item in run["items"][start:]:
+            if item["status"] == "discarded" and not include_discarded:
+                continue
+            if len(page) == limit:
+                next_cursor = page[-1]["id"]
+                break
+            page.append(item)
+        return page, next_cursor
+
+    async def list_runs(self, limit: int = 20) -> list[dict]:
+        """Newest runs first, without their items."""
+        run_ids = list(reversed(self._live))
+        run_ids += [p.stem for p in await self._run_paths() if p.stem not in self._live]
+        runs = []
+        for run_id in run_ids[:limit]:
+            run = await self.get(run_id)
+            runs.append({k: v for k, v in run.items() if k != "items"} | {"item_count": len(run["items"])})
+        return runs
+
+    async def _save_now(self, run: dict) -> None:
+        await json_store.write(self._path(run["id"]), copy.deepcopy(run))
+
+    async def _run_paths(self) -> list[Path]:
+        directory = RUNS_DIR
+
+        def scan() -> list[Path]:
+            if not directory.exists():
+                return []
+            paths = [p for p in directory.glob("*.json") if not p.name.startswith(".")]
+            return sorted(paths, key=lambda p: p.stat().st_mtime, reverse=True)
+
+        return await asyncio.to_thread(scan)
+
+    async def _prune(self) -> None:
+        for path in (await self._run_paths())[MAX_RUNS:]:
+            if path.stem not in self._live:
+                await json_store.delete(path)
+
+
+def _find_item(run: dict, item_id: str) -> dict:
+    for item in run["items"]:
+        if item["id"] == item_id:
+            return item
+    raise RunNotFound(f"{run['id']}/{item_id}")
+
+
+batch_store = BatchStore()
@@ -0,0 +1,142 @@
+"""Response compression for the dashboard, JSON API and static files.
+
+Responses whose content type compresses well and whose body reaches
+``minimum_size`` are sent with brotli when the client accepts it and the
+``brotli`` package is installed (``pip install brotli``), otherwise gzip.
+Smaller bodies go out as-is, since the framing overhead outweighs the saving.
+Bodies are compressed chunk by chunk as they stream, never buffered whole.
+Event streams are left alone, since compressors hold back partial output.
+"""
+
+import zlib
+from typing import Callable
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "application/rss+xml",
+    "image/svg+xml",
+)
+UNCOMPRESSIBLE_TYPES = ("text/event-stream",)
+
+
+def _accepted_encodings(accept_encoding: str) -> set[str]:
+    accepted = set()
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        q = params.strip().removeprefix("q=")
+        try:
+            if params and float(q) == 0:
+                continue
+        except ValueError:
+            continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+def choose_encoding(accept_encoding: str) -> str | None:
+    accepted = _accepted_encodings(accept_encoding)
+    if brotli is not None and ("br" in accepted or "*" in accepted):
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+def _compressor(encoding: str, gzip_level: int, brotli_quality: int) -> tuple[Callable, Callable]:
+    """(compress, flush) functions for one response body."""
+    if encoding == "br":
+        c = brotli.Compressor(quality=brotli_quality)
+        return c.process, c.finish
+    # wbits 16 + MAX_WBITS writes a gzip header and trailer
+    c = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return c.compress, c.flush
+
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+
+        start: Message | None = None
+        compress: Callable | None = None
+        flush: Callable | None = None
+        passthrough = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start, compress, flush, passthrough
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if compress is not None:
+                more_body = message.get("more_body", False)
+                chunk = compress(message.get("body", b""))
+                if not more_body:
+                    chunk += flush()
+                if chunk or not more_body:
+                    await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+                return
+            if passthrough or message["type"] != "http.response.body":
+                if start is not None:
+                    await send(start)
+                    start = None
+                passthrough = True
+                return await send(message)
+
+            # First body chunk: decide for the whole response
+            passthrough = True
+            response_start, start = start, None
+            headers = MutableHeaders(raw=response_start["headers"])
+            if not self._compressible_type(headers):
+                await send(response_start)
+                return await send(message)
+            # Identity and small responses are variants too, for shared caches
+            headers.add_vary_header("Accept-Encoding")
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            size = int(headers.get("content-length", -1)) if more_body else len(body)
+            if encoding is None or response_start["status"] != 200 or 0 <= size < self.minimum_size:
+                await send(response_start)
+                return await send(message)
+
+            passthrough = False
+            compress, flush = _compressor(encoding, self.gzip_level, self.brotli_quality)
+            headers["content-encoding"] = encoding
+            # The compressed bytes differ, so a strong validator no longer applies
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                headers["etag"] = f"W/{etag}"
+            if more_body:
+                if "content-length" in headers:
+                    del headers["content-length"]
+                await send(response_start)
+                return await send_wrapper(message)
+            body = compress(body) + flush()
+            headers["content-length"] = str(len(body))
+            await send(response_start)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_wrapper)
+
+    def _compressible_type(self, headers: Headers) -> bool:
+        content_type = headers.get("content-type", "")
+        if "content-encoding" in headers or content_type.startswith(UNCOMPRESSIBLE_TYPES):
+            return False
+        return content_type.startswith(COMPRESSIBLE_TYPES)
@@ -7,8 +7,49 @@ class Settings(BaseSettings):
     linkedin_redirect_uri: str = "http://localhost:8000/auth/callback"
     app_secret_key: str = "change-me"
     linkedin_api_version: str = "202502"
+    # Local LinkedIn API limits; a rate of 0 disables that bucket
+    linkedin_member_rps: float = 1.0
+    linkedin_app_rps: float = 5.0
+    linkedin_member_daily_limit: int = 500
+    linkedin_app_daily_limit: int = 100000
+    linkedin_max_retries: int = 3
+    linkedin_retry_base_delay: float = 1.0
+    linkedin_max_retry_wait: float = 60.0
+    # How long repeated 429s without Retry-After pause the member's quota
+    linkedin_quota_cooloff: float = 900.0
     ollama_base_url: str = "http://localhost:11434"
     ollama_model: str = "llama3.2"
+    # Fixed context window for generation, and token budgets inside it
+    ollama_num_ctx: int = 2048
+    reply_max_post_tokens: int = 384
+    reply_tokens_per_suggestion: int = 96
+    # Small model that screens batch posts before full generation; empty disables triage
+    triage_model: str = ""
+    triage_threshold: float = 6.0
+    triage_num_predict: int = 48
+    # Model calls in flight at once (match OLLAMA_NUM_PARALLEL) and the
+    # fair-queuing share each priority class gets while others are waiting
+    ollama_max_concurrency: int = 1
+    llm_priority_weights: dict[str, float] = {"interactive": 8.0, "batch": 2.0, "prefetch": 1.0}
+    # End-to-end budgets and admission limits for the auto pipeline
+    discover_deadline_seconds: float = 60.0
+    batch_deadline_seconds: float = 300.0
+    batch_max_active: int = 1
+    batch_max_queued: int = 2
+    # Search engines tried in order until one returns posts; lightweight ones first
+    search_engines: list[str] = ["bing_rss", "ddg_lite", "ddgs", "brave", "yahoo", "ecosia", "startpage"]
+    # Routers mounted at startup; drop the ones a worker doesn't serve
+    enabled_routers: list[str] = ["auth", "comments", "auto", "dashboard"]
+    # "unix:/path/to.sock" or "host:port" of the shared browser worker; empty = in-process
+    browser_worker_address: str = ""
+    # "http" posts comments via the Voyager API with browser cookies; "browser" always drives Chrome
+    comment_backend: str = "http"
+    # Responses smaller than this (bytes) are sent uncompressed
+    compression_min_size: int = 1024
+    # Per-request profiling, triggered by an X-Profile header or ?profile=1
+    profiling_enabled: bool = False
+    profile_dir: str = "~/.linkedin-tool/profiles"
+    profile_retention: int = 50
 
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
 
@@ -0,0 +1,60 @@
+"""Request-level deadlines propagated through contextvars.
+
+A route opens ``with deadline(seconds):`` and every stage below it (search,
+scrape, generation, posting) sizes its own timeout with ``remaining()``, so
+the whole request finishes within its budget instead of each stage
+applying its full fixed timeout.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+_deadline: ContextVar[Optional[float]] = ContextVar("deadline", default=None)
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+@contextmanager
+def deadline(seconds: float):
+    """Bound everything in this block to ``seconds``; nested deadlines only tighten."""
+    at = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(at if current is None else min(at, current))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+@contextmanager
+def no_deadline():
+    """Lift the deadline for this block, e.g. for work shared by several callers."""
+    token = _deadline.set(None)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining(default: Optional[float]) -> Optional[float]:
+    """Timeout for the next stage: ``default``, capped by the time left.
+
+    A ``default`` of None means no cap other than the deadline (if any).
+    Raises DeadlineExceeded if the deadline has already passed.
+    """
+    at = _deadline.get()
+    if at is None:
+        return default
+    left = at - time.monotonic()
+    if left <= 0:
+        raise DeadlineExceeded("Request deadline exceeded")
+    return left if default is None else min(default, left)
+
+
+def expired() -> bool:
+    at = _deadline.get()
+    return at is not None and time.monotonic() >= at
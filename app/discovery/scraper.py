@@ -3,7 +3,9 @@ from dataclasses import dataclass
 from typing import Optional
 
 import httpx
-from bs4 import BeautifulSoup
+
+from app.deadline import remaining
+from app.singleflight import SingleFlight
 
 
 @dataclass
@@ -13,7 +15,20 @@ class PostContent:
     author: str
 
 
+_inflight = SingleFlight()
+
+
+def _url_key(url: str) -> str:
+    # Tracking params and fragments don't change the page
+    return url.strip().split("#")[0].split("?")[0].rstrip("/")
+
+
 async def scrape_post_text(url: str) -> Optional[PostContent]:
+    """Extract post text from a public LinkedIn post page, sharing in-flight fetches."""
+    return await _inflight.do(_url_key(url), _scrape_post_text, url)
+
+
+async def _scrape_post_text(url: str) -> Optional[PostContent]:
     """Extract post text from a public LinkedIn post page using meta tags."""
     headers = {
         "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
@@ -22,10 +37,12 @@ async def scrape_post_text(url: str) -> Optional[PostContent]:
         "Accept-Language": "en-US,en;q=0.9",
     }
     try:
-        async with httpx.AsyncClient(follow_redirects=True, timeout=15) as client:
+        async with httpx.AsyncClient(follow_redirects=True, timeout=remaining(15)) as client:
             resp = await client.get(url, headers=headers)
             resp.raise_for_status()
 
+        from bs4 import BeautifulSoup
+
         soup = BeautifulSoup(resp.text, "html.parser")
 
         # Try og:description first (contains post text)
@@ -3,15 +3,25 @@ import hashlib
 import json
 import re
 import time
+import xml.etree.ElementTree as ET
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Awaitable, Callable, Optional
+from urllib.parse import unquote
 
 import httpx
-from bs4 import BeautifulSoup
+
+from app.config import settings
+from app.deadline import DeadlineExceeded, remaining
+from app.linkedin.url_parser import activity_id_from_url, activity_timestamp
+from app.singleflight import SingleFlight, normalize
+from app.storage import json_store
 
 CACHE_DIR = Path.home() / ".linkedin-tool" / "cache"
 CACHE_TTL = 1800  # 30 minutes
 
+_inflight = SingleFlight()
+
 
 @dataclass
 class PostResult:
@@ -36,6 +46,8 @@ POST_URL_RE = re.compile(
 
 def _extract_posts_from_html(html: str) -> list[PostResult]:
     """Extract LinkedIn post URLs from search result HTML."""
+    from bs4 import BeautifulSoup
+
     soup = BeautifulSoup(html, "html.parser")
     seen_ids = set()
     posts = []
@@ -62,7 +74,7 @@ def _extract_posts_from_html(html: str) -> list[PostResult]:
 
 
 async def _search_brave(query: str) -> str:
-    async with httpx.AsyncClient(follow_redirects=True, timeout=20) as client:
+    async with httpx.AsyncClient(follow_redirects=True, timeout=remaining(20)) as client:
         resp = await client.get(
             "https://search.brave.com/search",
             params={"q": query, "source": "web"},
@@ -73,7 +85,7 @@ async def _search_brave(query: str) -> str:
 
 
 async def _search_startpage(query: str) -> str:
-    async with httpx.AsyncClient(follow_redirects=True, timeout=20) as client:
+    async with httpx.AsyncClient(follow_redirects=True, timeout=remaining(20)) as client:
         resp = await client.post(
             "https://www.startpage.com/sp/search",
             data={"query": query, "cat": "web"},
@@ -84,7 +96,7 @@ async def _search_startpage(query: str) -> str:
 
 
 async def _search_yahoo(query: str) -> str:
-    async with httpx.AsyncClient(follow_redirects=True, timeout=20) as client:
+    async with httpx.AsyncClient(follow_redirects=True, timeout=remaining(20)) as client:
         resp = await client.get(
             "https://search.yahoo.com/search",
             params={"p": query},
@@ -95,7 +107,7 @@ async def _search_yahoo(query: str) -> str:
 
 
 async def _search_ecosia(query: str) -> str:
-    async with httpx.AsyncClient(follow_redirects=True, timeout=20) as client:
+    async with httpx.AsyncClient(follow_redirects=True, timeout=remaining(20)) as client:
         resp = await client.get(
             "https://www.ecosia.org/search",
             params={"q": query, "method": "index"},
@@ -105,58 +117,218 @@ async def _search_ecosia(query: str) -> str:
         return resp.text
 
 
+async def _search_ddg_lite(query: str) -> str:
+    async with httpx.AsyncClient(follow_redirects=True, timeout=remaining(20)) as client:
+        resp = await client.post(
+            "https://lite.duckduckgo.com/lite/",
+            data={"q": query},
+            headers=HEADERS,
+        )
+        resp.raise_for_status()
+        return resp.text
+
+
+async def _search_bing_rss(query: str) -> str:
+    async with httpx.AsyncClient(follow_redirects=True, timeout=remaining(20)) as client:
+        resp = await client.get(
+            "https://www.bing.com/search",
+            params={"q": query, "format": "rss"},
+            headers={**HEADERS, "Accept": "application/rss+xml, application/xml"},
+        )
+        resp.raise_for_status()
+        return resp.text
+
+
+async def _search_ddgs(query: str) -> str:
+    """Results from the duckduckgo-search package, serialized so they fit the engine interface."""
+    from duckduckgo_search import DDGS
+
+    def search() -> list[dict]:
+        return DDGS(timeout=int(remaining(20))).text(query, max_results=25) or []
+
+    return json.dumps(await asyncio.to_thread(search))
+
+
+def _extract_posts_from_lite_html(html: str) -> list[PostResult]:
+    # DuckDuckGo wraps result links in percent-encoded redirects
+    return _extract_posts_from_html(unquote(html))
+
+
+def _posts_from_links(links: list[tuple[str, str, str]]) -> list[PostResult]:
+    """Build results from (url, title, snippet) triples, keeping LinkedIn posts only."""
+    seen_ids = set()
+    posts = []
+    for url, title, snippet in links:
+        match = POST_URL_RE.search(url or "")
+        if not match or match.group(2) in seen_ids:
+            continue
+        seen_ids.add(match.group(2))
+        posts.append(PostResult(
+            url=f"https://www.linkedin.com/posts/{match.group(1)}",
+            title=title.strip(),
+            snippet=snippet.strip()[:300],
+        ))
+    return posts
+
+
+def _extract_posts_from_rss(xml: str) -> list[PostResult]:
+    root = ET.fromstring(xml)
+    return _posts_from_links([
+        (item.findtext("link", ""), item.findtext("title", ""), item.findtext("description", ""))
+        for item in root.iter("item")
+    ])
+
+
+def _extract_posts_from_ddgs(payload: str) -> list[PostResult]:
+    return _posts_from_links([
+        (r.get("href", ""), r.get("title", ""), r.get("body", ""))
+        for r in json.loads(payload)
+    ])
+
+
+@dataclass
+class Engine:
+    fetch: Callable[[str], Awaitable[str]]
+    parse: Callable[[str], list[PostResult]]
+    # False when the payload isn't the response body (e.g. re-serialized
+    # library results), so its size says nothing about bytes downloaded
+    payload_is_body: bool = True
+
+
+# Every engine fetches a payload for a query and parses it into posts; the
+# order tried comes from settings.search_engines
+ENGINES = {
+    "bing_rss": Engine(_search_bing_rss, _extract_posts_from_rss),
+    "ddg_lite": Engine(_search_ddg_lite, _extract_posts_from_lite_html),
+    "ddgs": Engine(_search_ddgs, _extract_posts_from_ddgs, payload_is_body=False),
+    "brave": Engine(_search_brave, _extract_posts_from_html),
+    "yahoo": Engine(_search_yahoo, _extract_posts_from_html),
+    "ecosia": Engine(_search_ecosia, _extract_posts_from_html),
+    "startpage": Engine(_search_startpage, _extract_posts_from_html),
+}
+
+
+def _check_engines() -> None:
+    # Fail at startup rather than with a KeyError on every search
+    for name in settings.search_engines:
+        if name not in ENGINES:
+            raise ValueError(f"Unknown engine in SEARCH_ENGINES: {name}")
+
+
+_check_engines()
+
+
+@dataclass
+class EngineStats:
+    bytes_measured: bool = True
+    calls: int = 0
+    hits: int = 0
+    errors: int = 0
+    bytes: int = 0
+    fetch_seconds: float = 0.0
+    parse_seconds: float = 0.0
+
+    def as_dict(self) -> dict:
+        ok = self.calls - self.errors
+        return {
+            "calls": self.calls,
+            "hits": self.hits,
+            "errors": self.errors,
+            "hit_rate": self.hits / self.calls if self.calls else None,
+            "mean_bytes": self.bytes / ok if ok and self.bytes_measured else None,
+            "mean_fetch_s": self.fetch_seconds / self.calls if self.calls else None,
+            "mean_parse_s": self.parse_seconds / ok if ok else None,
+        }
+
+
+engine_stats = {name: EngineStats(bytes_measured=engine.payload_is_body) for name, engine in ENGINES.items()}
+
+
 def _cache_key(query: str) -> Path:
     h = hashlib.md5(query.encode()).hexdigest()[:12]
     return CACHE_DIR / f"{h}.json"
 
 
-def _load_cache(query: str) -> list[PostResult] | None:
-    path = _cache_key(query)
-    if not path.exists():
+async def _load_cache(query: str) -> list[PostResult] | None:
+    data = await json_store.read(_cache_key(query))
+    if not data:
         return None
-    data = json.loads(path.read_text())
     if time.time() - data.get("ts", 0) > CACHE_TTL:
         return None
     return [PostResult(**p) for p in data.get("posts", [])]
 
 
 def _save_cache(query: str, posts: list[PostResult]) -> None:
-    CACHE_DIR.mkdir(parents=True, exist_ok=True)
     data = {"ts": time.time(), "posts": [{"url": p.url, "title": p.title, "snippet": p.snippet} for p in posts]}
-    _cache_key(query).write_text(json.dumps(data))
+    json_store.write(_cache_key(query), data)
 
 
-async def find_linkedin_posts(
-    topic: str = "crypto OR cryptocurrency OR stock market",
-    max_results: int = 10,
-) -> list[PostResult]:
-    """Search for recent LinkedIn posts using multiple search engines with caching."""
-    query = f"site:linkedin.com/posts {topic}"
-
+async def _search_all_engines(query: str) -> list[PostResult]:
     # Check cache first
-    cached = _load_cache(query)
+    cached = await _load_cache(query)
     if cached:
-        return cached[:max_results]
-
-    engines = [
-        _search_brave,
-        _search_yahoo,
-        _search_ecosia,
-        _search_startpage,
-    ]
+        return cached
 
-    for search_fn in engines:
+    for name in settings.search_engines:
+        engine, stats = ENGINES[name], engine_stats[name]
+        stats.calls += 1
+        start = time.perf_counter()
         try:
-            html = await search_fn(query)
-            posts = _extract_posts_from_html(html)
+            payload = await engine.fetch(query)
+            fetched = time.perf_counter()
+            stats.fetch_seconds += fetched - start
+            if engine.payload_is_body:
+                stats.bytes += len(payload.encode())
+            posts = engine.parse(payload)
+            stats.parse_seconds += time.perf_counter() - fetched
             if posts:
+                stats.hits += 1
                 _save_cache(query, posts)
-                return posts[:max_results]
+                return posts
+        except DeadlineExceeded:
+            stats.errors += 1
+            raise
         except httpx.HTTPStatusError as e:
+            stats.errors += 1
             if e.response.status_code == 429:
-                await asyncio.sleep(2)
+                await asyncio.sleep(remaining(2))
                 continue
         except Exception:
+            stats.errors += 1
             continue
 
     return []
+
+
+def _is_fresh(url: str, min_timestamp: float, newer_than: Optional[int]) -> bool:
+    try:
+        activity_id = activity_id_from_url(url)
+    except ValueError:
+        return False
+    if newer_than is not None and activity_id <= newer_than:
+        return False
+    return activity_timestamp(activity_id) >= min_timestamp
+
+
+async def find_linkedin_posts(
+    topic: str = "crypto OR cryptocurrency OR stock market",
+    max_results: int = 10,
+    max_age: Optional[float] = None,
+    newer_than: Optional[int] = None,
+) -> list[PostResult]:
+    """Search for recent LinkedIn posts using multiple search engines with caching.
+
+    ``max_age`` (seconds) and ``newer_than`` (an activity ID watermark) drop
+    posts using the creation time encoded in their IDs, before anything is
+    scraped. With ``newer_than`` the oldest posts come first, so advancing
+    the watermark to the newest returned post never skips one left over.
+    """
+    query = f"site:linkedin.com/posts {' '.join(topic.split())}"
+    # Concurrent searches for the same topic share one scrape
+    posts = await _inflight.do(normalize(query), _search_all_engines, query)
+    if max_age is not None or newer_than is not None:
+        min_timestamp = time.time() - max_age if max_age is not None else 0
+        posts = [p for p in posts if _is_fresh(p.url, min_timestamp, newer_than)]
+    if newer_than is not None:
+        posts = sorted(posts, key=lambda p: activity_id_from_url(p.url))
+    return posts[:max_results]
@@ -0,0 +1,40 @@
+"""Per-topic high-watermarks for incremental discovery.
+
+Stores the newest activity ID processed for each topic so repeat runs can
+skip posts they have already seen before scraping anything. Each consumer
+(``scope``) keeps its own marks, so listing posts in /discover doesn't hide
+them from a batch run that still has to reply to them.
+"""
+
+import asyncio
+from pathlib import Path
+from typing import Optional
+
+from app.singleflight import normalize
+from app.storage import json_store
+
+WATERMARKS_PATH = Path.home() / ".linkedin-tool" / "watermarks.json"
+
+_lock = asyncio.Lock()
+
+
+def _key(topic: str, scope: str) -> str:
+    return f"{scope}:{normalize(topic)}"
+
+
+async def get_watermark(topic: str, scope: str) -> Optional[int]:
+    data = await json_store.read(WATERMARKS_PATH) or {}
+    value = data.get(_key(topic, scope))
+    return int(value) if value else None
+
+
+async def advance_watermark(topic: str, scope: str, activity_id: int) -> None:
+    """Raise the topic's watermark to ``activity_id``; never moves it back."""
+    async with _lock:
+        data = dict(await json_store.read(WATERMARKS_PATH) or {})
+        key = _key(topic, scope)
+        if int(data.get(key) or 0) >= activity_id:
+            return
+        # Stored as a string: activity IDs exceed JavaScript's safe integer range
+        data[key] = str(activity_id)
+        await json_store.write(WATERMARKS_PATH, data)
@@ -0,0 +1,60 @@
+"""Concurrency limits shared by every worker process on this host.
+
+asyncio primitives only limit one process, so under ``uvicorn --workers N``
+each worker would admit its own full share. A slot here is an exclusive
+flock on one of ``size`` lock files under SLOTS_DIR: the limit holds across
+processes, and the OS releases a crashed worker's slots.
+
+Waiters poll rather than block in flock, so each can give up at its own
+deadline; a shorter poll interval makes a waiter more likely to get the
+next free slot, which is how priorities carry across workers.
+"""
+
+import asyncio
+import fcntl
+import os
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Optional
+
+SLOTS_DIR = Path.home() / ".linkedin-tool" / "slots"
+
+
+class HostSlots:
+    def __init__(self, name: str, size: int):
+        self.name = name
+        self.size = size
+
+    def try_acquire(self) -> Optional[int]:
+        """A locked fd for a free slot, or None if all are taken."""
+        SLOTS_DIR.mkdir(parents=True, exist_ok=True)
+        for i in range(self.size):
+            fd = os.open(SLOTS_DIR / f"{self.name}-{i}.lock", os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return fd
+            except BlockingIOError:
+                os.close(fd)
+        return None
+
+    async def acquire(self, timeout: Optional[float] = None, poll: float = 0.05) -> int:
+        """Wait for a slot; raises asyncio.TimeoutError after ``timeout`` seconds."""
+        give_up = None if timeout is None else time.monotonic() + timeout
+        while (fd := self.try_acquire()) is None:
+            if give_up is not None and time.monotonic() + poll > give_up:
+                raise asyncio.TimeoutError(f"No free {self.name} slot")
+            await asyncio.sleep(poll)
+        return fd
+
+    def release(self, fd: int) -> None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+    @asynccontextmanager
+    async def hold(self, timeout: Optional[float] = None, poll: float = 0.05):
+        fd = await self.acquire(timeout, poll)
+        try:
+            yield
+        finally:
+            self.release(fd)
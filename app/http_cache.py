@@ -0,0 +1,59 @@
+"""Cache validators for static assets and cacheable API responses.
+
+Templates link static files through ``static_url``, which appends a hash of
+the file's content, so those URLs can be cached for a year and a changed
+file gets a new URL. Unversioned static URLs and JSON from ``etag_json``
+are revalidated on every use, answered with 304 when unchanged.
+"""
+
+import hashlib
+import json
+from functools import lru_cache
+from pathlib import Path
+from urllib.parse import parse_qs
+
+from fastapi import Request
+from fastapi.responses import Response
+from fastapi.staticfiles import StaticFiles
+
+STATIC_DIR = Path("app/static")
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+
+@lru_cache(maxsize=None)
+def _content_hash(path: str) -> str:
+    return hashlib.sha256((STATIC_DIR / path).read_bytes()).hexdigest()[:12]
+
+
+def static_url(path: str) -> str:
+    """URL of a static file, versioned by its content."""
+    return f"/static/{path}?v={_content_hash(path)}"
+
+
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles (which already handles ETag/304) plus Cache-Control."""
+
+    def file_response(self, full_path, stat_result, scope, status_code=200) -> Response:
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        versioned = "v" in parse_qs(scope.get("query_string", b"").decode())
+        response.headers["Cache-Control"] = IMMUTABLE if versioned else REVALIDATE
+        return response
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison: compression may have weakened the client's copy
+    tags = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+    return etag.removeprefix("W/") in tags
+
+
+def etag_json(request: Request, content, cache_control: str = "private, no-cache") -> Response:
+    """JSON response with an ETag; 304 when the client's copy is current."""
+    body = json.dumps(content, separators=(",", ":")).encode()
+    etag = f'W/"{hashlib.sha256(body).hexdigest()[:16]}"'
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if _etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
@@ -0,0 +1,134 @@
+"""Single owner process for the Playwright browser.
+
+Running uvicorn with several workers would otherwise launch one Chrome per
+worker, all fighting over the same profile directory. Instead, start one
+dedicated browser worker and point the API workers at it:
+
+    python -m app.linkedin.browser_worker            # listens on BROWSER_WORKER_ADDRESS
+    BROWSER_WORKER_ADDRESS=unix:/tmp/linkedin-browser.sock \\
+        uvicorn app.main:app --workers 4
+
+The protocol is one JSON object per line in each direction. When
+BROWSER_WORKER_ADDRESS is unset, comments are posted in-process instead.
+"""
+
+import asyncio
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from app.config import settings
+from app.deadline import remaining
+from app.linkedin import voyager_client
+
+logger = logging.getLogger(__name__)
+
+# Playwright's sync API is bound to the thread that started it, so every
+# browser call goes through this one thread.
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="browser")
+
+# Upper bound for one browser operation, including a manual login
+BROWSER_TIMEOUT = 300
+
+OPERATIONS = {
+    "post_comment": voyager_client.post_comment,
+    "export_session": voyager_client.export_session,
+}
+
+
+def _parse_address(address: str) -> tuple[str | None, str | int]:
+    """Return (host, port) for 'host:port', or (None, path) for 'unix:/path'."""
+    if address.startswith("unix:"):
+        return None, address[len("unix:"):]
+    host, _, port = address.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+async def _open_connection(address: str):
+    host, target = _parse_address(address)
+    if host is None:
+        return await asyncio.open_unix_connection(target)
+    return await asyncio.open_connection(host, target)
+
+
+async def _run_local(op: str, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, OPERATIONS[op], *args)
+
+
+async def _call_remote(address: str, op: str, *args):
+    reader, writer = await _open_connection(address)
+    try:
+        writer.write(json.dumps({"op": op, "args": list(args)}).encode() + b"\n")
+        await writer.drain()
+        line = await reader.readline()
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+    if not line:
+        raise RuntimeError("Browser worker closed the connection")
+    reply = json.loads(line)
+    if not reply.get("ok"):
+        raise RuntimeError(reply.get("error", "Browser worker error"))
+    return reply["result"]
+
+
+async def call(op: str, *args):
+    """Run a browser operation in the shared browser worker, or locally.
+
+    The caller stops waiting at the request deadline; the browser thread
+    finishes the operation in the background.
+    """
+    if settings.browser_worker_address:
+        coro = _call_remote(settings.browser_worker_address, op, *args)
+    else:
+        coro = _run_local(op, *args)
+    return await asyncio.wait_for(coro, timeout=remaining(BROWSER_TIMEOUT))
+
+
+async def post_comment(activity_id: str, comment_text: str) -> dict:
+    return await call("post_comment", activity_id, comment_text)
+
+
+async def export_session() -> dict:
+    return await call("export_session")
+
+
+async def _handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        line = await reader.readline()
+        if not line:
+            return
+        try:
+            request = json.loads(line)
+            if request.get("op") not in OPERATIONS:
+                raise ValueError(f"Unknown operation: {request.get('op')}")
+            result = await _run_local(request["op"], *request.get("args", []))
+            reply = {"ok": True, "result": result}
+        except Exception as e:
+            reply = {"ok": False, "error": str(e)}
+        writer.write(json.dumps(reply).encode() + b"\n")
+        await writer.drain()
+    finally:
+        writer.close()
+
+
+async def serve(address: str) -> None:
+    host, target = _parse_address(address)
+    if host is None:
+        # A socket left behind by a previous run would make bind() fail
+        Path(target).unlink(missing_ok=True)
+        server = await asyncio.start_unix_server(_handle, path=target)
+    else:
+        server = await asyncio.start_server(_handle, host, target)
+    logger.info(f"Browser worker listening on {address}")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    address = settings.browser_worker_address or "unix:/tmp/linkedin-browser.sock"
+    asyncio.run(serve(address))
@@ -1,14 +1,32 @@
+import asyncio
 from urllib.parse import quote
 
 import httpx
 
 from app.config import settings
+from app.deadline import remaining
+from app.linkedin.rate_limit import (
+    RETRYABLE_STATUSES,
+    backoff_delay,
+    exhaust_member_quota,
+    quota_snapshot,
+    reserve,
+    retry_after,
+    retry_budget,
+)
+from app.singleflight import SingleFlight
+
+_inflight = SingleFlight()
+
+REQUEST_TIMEOUT = 5.0  # httpx's default, now capped by the request deadline
 
 
 class LinkedInClient:
     BASE_URL = "https://api.linkedin.com"
+    BATCH_SIZE = 50
 
     def __init__(self, access_token: str):
+        self.access_token = access_token
         self.headers = {
             "Authorization": f"Bearer {access_token}",
             "LinkedIn-Version": settings.linkedin_api_version,
@@ -16,11 +34,53 @@ class LinkedInClient:
             "Content-Type": "application/json",
         }
 
+    async def quota(self) -> dict:
+        """Locally estimated daily calls left for this member and the app."""
+        return await quota_snapshot(self.access_token)
+
+    async def _send(
+        self, client: httpx.AsyncClient, method: str, url: str, idempotent: bool = True, **kwargs
+    ) -> httpx.Response:
+        """Send a request through the local rate limits, retrying throttled responses.
+
+        429s are always safe to retry; 5xx only for idempotent requests, since
+        a failed POST may still have created the comment.
+        """
+        budget = retry_budget()
+        budget.record_request()
+        attempt = 0
+        while True:
+            # Raises QuotaExhaustedError once either daily quota is used up
+            await asyncio.sleep(await reserve(self.access_token))
+
+            resp = await client.request(method, url, timeout=remaining(REQUEST_TIMEOUT), **kwargs)
+            if resp.status_code != 429 and not (idempotent and resp.status_code in RETRYABLE_STATUSES):
+                return resp
+
+            hinted = retry_after(resp)
+            retries_used_up = attempt >= settings.linkedin_max_retries
+            give_up = (
+                retries_used_up
+                or (hinted or 0) > settings.linkedin_max_retry_wait
+                or not budget.try_spend()
+            )
+            delay = backoff_delay(attempt, resp)
+            # Don't sleep for a retry that couldn't finish before the deadline
+            if give_up or remaining(delay + REQUEST_TIMEOUT) <= delay:
+                # 429s without Retry-After through every retry usually mean the
+                # daily limit; pause the member for a cool-off rather than
+                # trusting one throttle until midnight
+                if resp.status_code == 429 and hinted is None and retries_used_up:
+                    await exhaust_member_quota(self.access_token, settings.linkedin_quota_cooloff)
+                return resp
+            await asyncio.sleep(delay)
+            attempt += 1
+
     async def get_profile(self) -> dict:
         """Get the authenticated member's profile (sub = member ID)."""
         async with httpx.AsyncClient() as client:
-            resp = await client.get(
-                f"{self.BASE_URL}/v2/userinfo", headers=self.headers
+            resp = await self._send(
+                client, "GET", f"{self.BASE_URL}/v2/userinfo", headers=self.headers
             )
             resp.raise_for_status()
             return resp.json()
@@ -30,15 +90,44 @@ class LinkedInClient:
         return f"urn:li:person:{profile['sub']}"
 
     async def get_post(self, post_urn: str) -> dict:
-        """Fetch a post by its URN."""
+        """Fetch a post by its URN, sharing identical in-flight requests."""
+        return await _inflight.do((self.access_token, post_urn), self._get_post, post_urn)
+
+    async def _get_post(self, post_urn: str) -> dict:
         encoded = quote(post_urn, safe="")
         async with httpx.AsyncClient() as client:
-            resp = await client.get(
-                f"{self.BASE_URL}/rest/posts/{encoded}", headers=self.headers
+            resp = await self._send(
+                client, "GET", f"{self.BASE_URL}/rest/posts/{encoded}", headers=self.headers
             )
             resp.raise_for_status()
             return resp.json()
 
+    async def batch_get_posts(self, post_urns: list[str]) -> dict[str, dict]:
+        """Fetch many posts with Rest.li BATCH_GET, chunked; returns {urn: post} for hits."""
+        chunks = [post_urns[i:i + self.BATCH_SIZE] for i in range(0, len(post_urns), self.BATCH_SIZE)]
+        async with httpx.AsyncClient() as client:
+            results = await asyncio.gather(
+                *(self._batch_get_chunk(client, chunk) for chunk in chunks),
+                return_exceptions=True,
+            )
+        posts = {}
+        for result in results:
+            # A failed chunk just leaves its URNs as misses
+            if isinstance(result, dict):
+                posts.update(result)
+        return posts
+
+    async def _batch_get_chunk(self, client: httpx.AsyncClient, post_urns: list[str]) -> dict[str, dict]:
+        ids = ",".join(quote(urn, safe="") for urn in post_urns)
+        resp = await self._send(
+            client,
+            "GET",
+            f"{self.BASE_URL}/rest/posts?ids=List({ids})",
+            headers={**self.headers, "X-RestLi-Method": "BATCH_GET"},
+        )
+        resp.raise_for_status()
+        return resp.json().get("results", {})
+
     async def post_comment(
         self, post_urn: str, actor_urn: str, text: str
     ) -> dict:
@@ -50,8 +139,11 @@ class LinkedInClient:
             "message": {"text": text},
         }
         async with httpx.AsyncClient() as client:
-            resp = await client.post(
+            resp = await self._send(
+                client,
+                "POST",
                 f"{self.BASE_URL}/rest/socialActions/{encoded}/comments",
+                idempotent=False,
                 headers=self.headers,
                 json=payload,
             )
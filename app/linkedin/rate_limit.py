@@ -0,0 +1,186 @@
+"""Local rate limiting for the LinkedIn REST API.
+
+LinkedIn enforces per-member and per-application limits, both as short-term
+throttles (429 with Retry-After) and as daily quotas that reset at midnight
+UTC. We mirror both locally so callers slow down before LinkedIn starts
+rejecting requests, and so the batch pipeline can see how much quota is
+left.
+
+Token buckets and quotas live in STATE_PATH and every request updates them
+under the file's lock, so the limits hold across ``uvicorn --workers N``
+rather than multiplying by N. Members are keyed by a hash of their access
+token. The retry budget stays per process.
+"""
+
+import hashlib
+import random
+import time
+from dataclasses import asdict, dataclass
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Optional
+
+import httpx
+
+from app.config import settings
+from app.storage import json_store
+
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+STATE_PATH = Path.home() / ".linkedin-tool" / "rate_limits.json"
+
+
+class QuotaExhaustedError(RuntimeError):
+    pass
+
+
+def _next_utc_midnight(now: float) -> float:
+    return (now // 86400 + 1) * 86400
+
+
+@dataclass
+class LimitState:
+    """One scope's token bucket and daily quota, as stored in STATE_PATH."""
+
+    tokens: float
+    updated: float
+    used: int
+    resets_at: float
+    # Set after LinkedIn signalled its daily limit; expires after a cool-off
+    exhausted_until: float = 0.0
+
+    @classmethod
+    def load(cls, stored: Optional[dict], capacity: float, now: float) -> "LimitState":
+        if not stored:
+            return cls(tokens=capacity, updated=now, used=0, resets_at=_next_utc_midnight(now))
+        state = cls(**stored)
+        if now >= state.resets_at:
+            state.used = 0
+            state.resets_at = _next_utc_midnight(now)
+        return state
+
+    def remaining(self, limit: int, now: float) -> int:
+        if now < self.exhausted_until:
+            return 0
+        return max(0, limit - self.used)
+
+    def reserve(self, rate: float, capacity: float, now: float) -> float:
+        """Take a token, going into debt if none is left; returns seconds to wait."""
+        if rate <= 0:
+            return 0.0
+        self.tokens = min(capacity, self.tokens + (now - self.updated) * rate)
+        self.updated = now
+        self.tokens -= 1
+        return max(0.0, -self.tokens / rate)
+
+
+def _scopes(account: str) -> dict[str, tuple[float, int]]:
+    """State key -> (requests per second, daily limit) for a request by ``account``."""
+    member = "member:" + hashlib.sha256(account.encode()).hexdigest()[:16]
+    return {
+        member: (settings.linkedin_member_rps, settings.linkedin_member_daily_limit),
+        "app": (settings.linkedin_app_rps, settings.linkedin_app_daily_limit),
+    }
+
+
+async def reserve(account: str) -> float:
+    """Count one request against the member and app limits.
+
+    Returns the seconds to wait before sending it; raises QuotaExhaustedError
+    (without counting the request) if either daily quota is used up.
+    """
+    scopes = _scopes(account)
+    delay = 0.0
+
+    def apply(data: Optional[dict]) -> dict:
+        nonlocal delay
+        data = data or {}
+        now = time.time()
+        states = {key: LimitState.load(data.get(key), max(1.0, rps), now) for key, (rps, _) in scopes.items()}
+        for key, (_, limit) in scopes.items():
+            if not states[key].remaining(limit, now):
+                raise QuotaExhaustedError("LinkedIn daily quota exhausted")
+        delay = 0.0
+        for key, (rps, _) in scopes.items():
+            states[key].used += 1
+            delay = max(delay, states[key].reserve(rps, max(1.0, rps), now))
+        return {**data, **{key: asdict(state) for key, state in states.items()}}
+
+    await json_store.update(STATE_PATH, apply)
+    return delay
+
+
+async def exhaust_member_quota(account: str, seconds: float) -> None:
+    """Treat the member's quota as used up for ``seconds`` (at most until the daily reset)."""
+    key = next(iter(_scopes(account)))
+
+    def apply(data: Optional[dict]) -> dict:
+        data = data or {}
+        now = time.time()
+        state = LimitState.load(data.get(key), max(1.0, settings.linkedin_member_rps), now)
+        state.exhausted_until = min(now + seconds, state.resets_at)
+        return {**data, key: asdict(state)}
+
+    await json_store.update(STATE_PATH, apply)
+
+
+class RetryBudget:
+    """Caps retries to a fraction of recent traffic so retries can't snowball."""
+
+    def __init__(self, ratio: float, max_tokens: float):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+
+    def record_request(self) -> None:
+        self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+_retry_budget = RetryBudget(ratio=0.2, max_tokens=10)
+
+
+def retry_after(resp: httpx.Response) -> float | None:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)."""
+    value = resp.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, resp: httpx.Response | None = None) -> float:
+    """Full-jitter exponential backoff, never shorter than the server's Retry-After."""
+    delay = random.uniform(0, settings.linkedin_retry_base_delay * 2 ** attempt)
+    hinted = retry_after(resp) if resp is not None else None
+    return max(delay, hinted or 0.0)
+
+
+def retry_budget() -> RetryBudget:
+    return _retry_budget
+
+
+async def quota_snapshot(account: str) -> dict:
+    data = await json_store.read(STATE_PATH) or {}
+    now = time.time()
+    remaining, resets_at = [], []
+    for key, (rps, limit) in _scopes(account).items():
+        state = LimitState.load(data.get(key), max(1.0, rps), now)
+        remaining.append(state.remaining(limit, now))
+        resets_at.append(state.exhausted_until if now < state.exhausted_until else state.resets_at)
+    return {
+        "member_remaining": remaining[0],
+        "app_remaining": remaining[1],
+        "remaining": min(remaining),
+        "resets_at": min(resets_at),
+    }
@@ -15,3 +15,16 @@ def extract_activity_urn(url: str) -> str:
         if match:
             return f"urn:li:activity:{match.group(1)}"
     raise ValueError(f"Could not extract activity URN from URL: {url}")
+
+
+def activity_timestamp(activity_id: str | int) -> float:
+    """Creation time (Unix seconds) encoded in a LinkedIn activity ID.
+
+    The first 41 bits of the 64-bit ID are milliseconds since the epoch.
+    """
+    return (int(activity_id) >> 22) / 1000
+
+
+def activity_id_from_url(url: str) -> int:
+    """Numeric activity ID of a post URL or URN; raises ValueError if absent."""
+    return int(extract_activity_urn(url).rsplit(":", 1)[-1])
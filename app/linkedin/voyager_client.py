@@ -7,22 +7,27 @@ The session persists across restarts via a local browser profile.
 import logging
 import os
 import time
+from typing import TYPE_CHECKING
 
-from playwright.sync_api import sync_playwright, BrowserContext, Playwright
+if TYPE_CHECKING:
+    from playwright.sync_api import BrowserContext, Playwright
 
 logger = logging.getLogger(__name__)
 
-_pw: Playwright | None = None
-_context: BrowserContext | None = None
+_pw: "Playwright | None" = None
+_context: "BrowserContext | None" = None
 _profile_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", ".linkedin-browser")
 
 
-def _get_browser_context() -> BrowserContext:
+def _get_browser_context() -> "BrowserContext":
     """Return a persistent Chrome context (launches once, reuses after)."""
     global _pw, _context
     if _context:
         return _context
 
+    # Imported here so the API server starts without loading Playwright
+    from playwright.sync_api import sync_playwright
+
     profile = os.path.abspath(_profile_dir)
     logger.info(f"Launching Chrome with profile at {profile}")
     _pw = sync_playwright().start()
@@ -56,6 +61,26 @@ def _ensure_logged_in(page) -> bool:
     return True
 
 
+def export_session() -> dict:
+    """Return the browser's LinkedIn session cookies and CSRF token.
+
+    Lets comments be posted over plain HTTP (see voyager_http) without
+    driving the browser. Logs in first if the profile has no session.
+    """
+    ctx = _get_browser_context()
+    cookies = {c["name"]: c["value"] for c in ctx.cookies("https://www.linkedin.com")}
+    if "li_at" not in cookies:
+        page = ctx.new_page()
+        try:
+            if not _ensure_logged_in(page):
+                raise RuntimeError("Not logged in to LinkedIn. Please log in via the browser window and retry.")
+        finally:
+            page.close()
+        cookies = {c["name"]: c["value"] for c in ctx.cookies("https://www.linkedin.com")}
+    # LinkedIn expects the JSESSIONID value (without quotes) as the csrf-token header
+    return {"cookies": cookies, "csrf_token": cookies.get("JSESSIONID", "").strip('"')}
+
+
 def post_comment(activity_id: str, comment_text: str) -> dict:
     """Post a comment on a LinkedIn post via browser automation.
 
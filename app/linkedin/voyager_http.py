@@ -0,0 +1,102 @@
+"""Comment posting over plain HTTP using the browser's LinkedIn session.
+
+The session cookies and CSRF token are exported from the Playwright profile
+once, then each comment is a single request to LinkedIn's Voyager API on a
+pooled connection. The browser is only used again to export a fresh session
+or, if the HTTP path is rejected, to post via DOM automation.
+"""
+
+import asyncio
+import logging
+from typing import Optional
+
+import httpx
+
+from app.config import settings
+from app.deadline import remaining
+from app.linkedin import browser_worker
+
+logger = logging.getLogger(__name__)
+
+VOYAGER_BASE_URL = "https://www.linkedin.com/voyager/api"
+COMMENTS_PATH = "/voyagerSocialDashNormComments"
+
+_session: Optional[dict] = None
+_session_lock = asyncio.Lock()
+_client: Optional[httpx.AsyncClient] = None
+
+
+class SessionExpiredError(RuntimeError):
+    pass
+
+
+def set_session(session: Optional[dict]) -> None:
+    """Install a session ({"cookies": {...}, "csrf_token": str}); None forgets it."""
+    global _session
+    _session = session
+
+
+def _get_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            timeout=20,
+            limits=httpx.Limits(max_connections=10, max_keepalive_connections=5),
+        )
+    return _client
+
+
+async def _get_session() -> dict:
+    global _session
+    if _session is None:
+        async with _session_lock:
+            if _session is None:
+                _session = await browser_worker.export_session()
+    return _session
+
+
+async def _post_via_http(activity_id: str, comment_text: str) -> dict:
+    session = await _get_session()
+    if "li_at" not in session["cookies"]:
+        raise SessionExpiredError("No li_at cookie in browser session")
+
+    headers = {
+        "csrf-token": session["csrf_token"],
+        "x-restli-protocol-version": "2.0.0",
+        "accept": "application/vnd.linkedin.normalized+json+2.1",
+        "content-type": "application/json",
+        "x-li-lang": "en_US",
+    }
+    payload = {
+        "commentary": {
+            "text": comment_text,
+            "attributesV2": [],
+            "$type": "com.linkedin.voyager.dash.common.text.TextViewModel",
+        },
+        "threadUrn": f"urn:li:activity:{activity_id}",
+    }
+    cookie_header = "; ".join(f"{k}={v}" for k, v in session["cookies"].items())
+    resp = await _get_client().post(
+        f"{VOYAGER_BASE_URL}{COMMENTS_PATH}",
+        headers={**headers, "cookie": cookie_header},
+        json=payload,
+        timeout=remaining(20),
+    )
+    if resp.status_code in (401, 403):
+        raise SessionExpiredError(f"Voyager API {resp.status_code}")
+    resp.raise_for_status()
+    return {"success": True, "data": "Comment posted via HTTP"}
+
+
+async def post_comment(activity_id: str, comment_text: str) -> dict:
+    """Post a comment over HTTP, falling back to the browser if the session is unusable."""
+    if settings.comment_backend == "browser":
+        return await browser_worker.post_comment(activity_id, comment_text)
+
+    try:
+        return await _post_via_http(activity_id, comment_text)
+    except (SessionExpiredError, httpx.ConnectError) as e:
+        # Nothing was posted; the browser path can also walk through re-login
+        logger.warning(f"HTTP comment posting unavailable ({e}), falling back to browser")
+        set_session(None)
+        return await browser_worker.post_comment(activity_id, comment_text)
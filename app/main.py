@@ -1,18 +1,37 @@
+from importlib import import_module
+
 from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
 from starlette.middleware.sessions import SessionMiddleware
 
+from app.compression import CompressionMiddleware
 from app.config import settings
-from app.routes.auth_routes import router as auth_router
-from app.routes.auto_routes import router as auto_router
-from app.routes.comment_routes import router as comment_router
-from app.routes.dashboard_routes import router as dashboard_router
+from app.http_cache import STATIC_DIR, CachedStaticFiles
+
+# Router modules are imported only when enabled, so a worker that doesn't
+# serve e.g. the dashboard never pays for its imports.
+ROUTERS = {
+    "auth": "app.routes.auth_routes",
+    "comments": "app.routes.comment_routes",
+    "auto": "app.routes.auto_routes",
+    "dashboard": "app.routes.dashboard_routes",
+    "admin": "app.routes.admin_routes",
+}
 
 app = FastAPI(title="LinkedIn Smart Replies")
 app.add_middleware(SessionMiddleware, secret_key=settings.app_secret_key)
-app.mount("/static", StaticFiles(directory="app/static"), name="static")
+app.mount("/static", CachedStaticFiles(directory=STATIC_DIR), name="static")
+
+for name in settings.enabled_routers:
+    if name not in ROUTERS:
+        raise ValueError(f"Unknown router in ENABLED_ROUTERS: {name}")
+    app.include_router(import_module(ROUTERS[name]).router)
+
+if settings.profiling_enabled:
+    from app.profiling import ProfilingMiddleware
+
+    app.add_middleware(ProfilingMiddleware)
+    if "admin" not in settings.enabled_routers:
+        app.include_router(import_module(ROUTERS["admin"]).router)
 
-app.include_router(auth_router)
-app.include_router(comment_router)
-app.include_router(auto_router)
-app.include_router(dashboard_router)
+# Outermost, so everything above is compressed on the way out
+app.add_middleware(CompressionMiddleware, minimum_size=settings.compression_min_size)
@@ -0,0 +1,116 @@
+"""On-demand profiling of single requests.
+
+When PROFILING_ENABLED is set, a request carrying an ``X-Profile: 1`` header
+or a ``?profile=1`` query flag is profiled and the report is written to
+PROFILE_DIR, which keeps only the newest PROFILE_RETENTION reports.
+
+pyinstrument (in requirements.txt) is used when installed: its async mode
+attributes time spent awaiting upstreams to the awaiting code. Without it
+the cProfile fallback records CPU time only, so async wait time is missing,
+and since it profiles the whole thread, concurrent requests show up too.
+"""
+
+import asyncio
+import cProfile
+import io
+import logging
+import pstats
+import re
+import time
+from pathlib import Path
+from urllib.parse import parse_qs
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    from pyinstrument import Profiler
+except ImportError:
+    Profiler = None
+
+
+def profile_dir() -> Path:
+    return Path(settings.profile_dir).expanduser()
+
+
+def _wants_profile(scope) -> bool:
+    for name, value in scope.get("headers", []):
+        if name == b"x-profile" and value not in (b"", b"0"):
+            return True
+    query = parse_qs(scope.get("query_string", b"").decode())
+    return query.get("profile", ["0"])[-1] not in ("", "0")
+
+
+def _save_report(name: str, report: str) -> None:
+    directory = profile_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / name).write_text(report)
+    reports = sorted(directory.iterdir(), key=lambda p: p.stat().st_mtime, reverse=True)
+    for old in reports[settings.profile_retention:]:
+        old.unlink(missing_ok=True)
+
+
+async def list_profiles() -> list[dict]:
+    directory = profile_dir()
+
+    def scan() -> list[dict]:
+        if not directory.exists():
+            return []
+        reports = []
+        for p in directory.iterdir():
+            try:
+                st = p.stat()
+            except FileNotFoundError:
+                # Pruned by a concurrent save
+                continue
+            reports.append({"name": p.name, "size": st.st_size, "created_at": st.st_mtime})
+        return sorted(reports, key=lambda r: r["created_at"], reverse=True)
+
+    return await asyncio.to_thread(scan)
+
+
+class ProfilingMiddleware:
+    """Pure ASGI middleware so the endpoint runs in the same task as the profiler."""
+
+    def __init__(self, app):
+        self.app = app
+        self._cprofile_busy = False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _wants_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        slug = re.sub(r"[^A-Za-z0-9]+", "-", scope["path"]).strip("-") or "root"
+        stamp = time.strftime("%Y%m%d-%H%M%S") + f"-{int(time.time() * 1000) % 1000:03d}"
+        start = time.perf_counter()
+
+        if Profiler is not None:
+            profiler = Profiler(async_mode="enabled")
+            profiler.start()
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                profiler.stop()
+                name = f"{stamp}-{scope['method']}-{slug}.html"
+                await asyncio.to_thread(_save_report, name, profiler.output_html())
+        elif not self._cprofile_busy:
+            # Only one cProfile profiler can be active per interpreter
+            self._cprofile_busy = True
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                profiler.disable()
+                self._cprofile_busy = False
+                out = io.StringIO()
+                out.write(f"{scope['method']} {scope['path']}: {time.perf_counter() - start:.3f}s wall\n\n")
+                pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(60)
+                name = f"{stamp}-{scope['method']}-{slug}.txt"
+                await asyncio.to_thread(_save_report, name, out.getvalue())
+        else:
+            await self.app(scope, receive, send)
+            return
+        logger.info(f"Saved profile {name}")
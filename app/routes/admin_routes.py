@@ -0,0 +1,22 @@
+import asyncio
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import FileResponse
+
+from app.profiling import list_profiles, profile_dir
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+@router.get("/profiles")
+async def profiles():
+    """Most recent request profiles, newest first."""
+    return {"profiles": [{**p, "url": f"/admin/profiles/{p['name']}"} for p in await list_profiles()]}
+
+
+@router.get("/profiles/{name}")
+async def get_profile(name: str):
+    path = profile_dir() / name
+    if "/" in name or name.startswith(".") or not await asyncio.to_thread(path.is_file):
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path)
@@ -3,6 +3,7 @@ from fastapi.responses import RedirectResponse
 
 from app.auth.oauth import exchange_code_for_token, generate_state, get_authorization_url
 from app.auth.token_store import token_store
+from app.http_cache import etag_json
 from app.linkedin.client import LinkedInClient
 
 router = APIRouter(prefix="/auth", tags=["auth"])
@@ -27,18 +28,18 @@ async def callback(request: Request, code: str, state: str):
     li = LinkedInClient(token_data["access_token"])
     member_urn = await li.get_member_urn()
     token_data["member_urn"] = member_urn
-    token_store.save_token(token_data)
+    await token_store.save_token(token_data)
 
     return RedirectResponse("/")
 
 
 @router.get("/status")
-async def status():
-    token = token_store.get_valid_token()
-    return {"authenticated": token is not None}
+async def status(request: Request):
+    token = await token_store.get_valid_token()
+    return etag_json(request, {"authenticated": token is not None})
 
 
 @router.post("/logout")
 async def logout():
-    token_store.clear()
+    await token_store.clear()
     return {"ok": True}
@@ -1,22 +1,39 @@
+import asyncio
+import time
 from typing import Optional
 
-from fastapi import APIRouter, HTTPException
+import httpx
+from fastapi import APIRouter, HTTPException, Query, Request
 from pydantic import BaseModel
 
-from app.ai.reply_generator import ReplyGenerator
+from app.admission import AdmissionController, AdmissionRejected
+from app.ai.reply_generator import get_reply_generator
+from app.ai.scheduler import BATCH, get_llm_scheduler
+from app.ai.triage import cascade_stats, get_triage_model
 from app.auth.token_store import token_store
+from app.batch_store import ItemConflict, RunNotFound, batch_store
+from app.config import settings
+from app.deadline import DeadlineExceeded, deadline, expired
 from app.discovery.scraper import scrape_multiple
-from app.discovery.search import find_linkedin_posts
+from app.discovery.search import PostResult, engine_stats, find_linkedin_posts
+from app.discovery.watermarks import advance_watermark, get_watermark
+from app.http_cache import etag_json
 from app.linkedin.client import LinkedInClient
-from app.linkedin.url_parser import extract_activity_urn
+from app.linkedin.rate_limit import QuotaExhaustedError
+from app.linkedin.url_parser import activity_id_from_url, activity_timestamp, extract_activity_urn
 
 router = APIRouter(prefix="/api/auto", tags=["auto"])
-reply_gen = ReplyGenerator()
+# Batch runs are mostly LLM work, so cap them to what the Ollama box can serve
+batch_admission = AdmissionController("batch", settings.batch_max_active, settings.batch_max_queued)
 
 
 class DiscoverRequest(BaseModel):
     topic: str = "crypto OR cryptocurrency OR stock market"
     max_posts: int = 8
+    # Skip posts older than this, judged from the activity ID before scraping
+    max_age_hours: Optional[float] = None
+    # Only posts newer than the newest one an earlier call here saw for this topic
+    only_new: bool = False
 
 
 class AutoReplyRequest(BaseModel):
@@ -31,31 +48,62 @@ class BatchReplyRequest(BaseModel):
     tone: str = "professional"
     user_context: Optional[str] = None
     max_posts: int = 5
+    max_age_hours: Optional[float] = None
+    only_new: bool = False
     auto_post: bool = False
+    # Seconds before returning whatever is done; capped by batch_deadline_seconds
+    deadline_seconds: Optional[float] = None
 
 
-def _get_client() -> LinkedInClient:
-    token = token_store.get_valid_token()
+async def _get_client() -> LinkedInClient:
+    token = await token_store.get_valid_token()
     if not token:
         raise HTTPException(status_code=401, detail="Not authenticated")
     return LinkedInClient(token)
 
 
+async def _find_posts(
+    topic: str, max_posts: int, max_age_hours: Optional[float], only_new: bool, scope: str
+) -> list[PostResult]:
+    newer_than = None
+    if only_new:
+        # 0 still orders results oldest first on a topic's first run
+        newer_than = await get_watermark(topic, scope) or 0
+    return await find_linkedin_posts(
+        topic=topic,
+        max_results=max_posts,
+        max_age=max_age_hours * 3600 if max_age_hours else None,
+        newer_than=newer_than,
+    )
+
+
+async def _advance_watermark(topic: str, scope: str, results: list[PostResult]) -> None:
+    ids = []
+    for r in results:
+        try:
+            ids.append(activity_id_from_url(r.url))
+        except ValueError:
+            continue
+    if ids:
+        await advance_watermark(topic, scope, max(ids))
+
+
 @router.post("/discover")
 async def discover_posts(body: DiscoverRequest):
     """Find trending LinkedIn posts on a topic."""
-    try:
-        results = await find_linkedin_posts(
-            topic=body.topic, max_results=body.max_posts
-        )
-    except Exception:
-        return {"posts": [], "message": "Search temporarily unavailable. Try again in a minute."}
+    with deadline(settings.discover_deadline_seconds):
+        try:
+            results = await _find_posts(body.topic, body.max_posts, body.max_age_hours, body.only_new, "discover")
+        except Exception:
+            return {"posts": [], "message": "Search temporarily unavailable. Try again in a minute."}
 
-    if not results:
-        return {"posts": [], "message": "No posts found"}
+        if not results:
+            return {"posts": [], "message": "No posts found"}
 
-    urls = [r.url for r in results]
-    scraped = await scrape_multiple(urls)
+        urls = [r.url for r in results]
+        scraped = await scrape_multiple(urls)
+        if body.only_new:
+            await _advance_watermark(body.topic, "discover", results)
 
     posts = []
     for p in scraped:
@@ -66,6 +114,7 @@ async def discover_posts(body: DiscoverRequest):
         posts.append({
             "url": p.url,
             "urn": urn,
+            "posted_at": activity_timestamp(urn.rsplit(":", 1)[-1]),
             "text": p.text,
             "author": p.author,
         })
@@ -80,7 +129,7 @@ async def generate_and_post(body: AutoReplyRequest):
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-    replies = await reply_gen.generate_replies(
+    replies = await get_reply_generator().generate_replies(
         post_text=body.post_text,
         num_suggestions=1,
         tone=body.tone,
@@ -88,8 +137,8 @@ async def generate_and_post(body: AutoReplyRequest):
     )
     comment = replies[0]
 
-    client = _get_client()
-    data = token_store.load_token()
+    client = await _get_client()
+    data = await token_store.load_token()
     if not data or not data.get("member_urn"):
         raise HTTPException(status_code=401, detail="No member URN")
 
@@ -104,54 +153,244 @@ async def generate_and_post(body: AutoReplyRequest):
 
 @router.post("/batch")
 async def batch_discover_and_reply(body: BatchReplyRequest):
-    """Full pipeline: discover posts, generate replies, optionally auto-post."""
-    # 1. Discover posts
-    results = await find_linkedin_posts(
-        topic=body.topic, max_results=body.max_posts
+    """Full pipeline: discover posts, generate replies, optionally auto-post.
+
+    Bounded by a deadline; when it hits, the items finished so far are
+    returned with ``partial: true``. Every run is stored under ``run_id``
+    so its items can be paged through and acted on later via /runs.
+    """
+    budget = settings.batch_deadline_seconds
+    if body.deadline_seconds:
+        budget = min(budget, body.deadline_seconds)
+
+    items, skipped = [], []
+    response = {"items": items}
+    with deadline(budget):
+        try:
+            async with batch_admission.admit():
+                run = await batch_store.create(body.model_dump())
+                response["run_id"] = run["id"]
+                status = "failed"
+                try:
+                    message = await _run_batch(body, run["id"], items, skipped)
+                    if message:
+                        response["message"] = message
+                    status = "done"
+                except (DeadlineExceeded, httpx.TimeoutException):
+                    response["partial"] = True
+                    status = "partial"
+                finally:
+                    await batch_store.finish(run["id"], status, skipped=skipped)
+        except AdmissionRejected as e:
+            raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
+
+    if skipped:
+        response["skipped"] = skipped
+    if body.auto_post:
+        # Items already carry any auth error; don't turn a finished run into a 401
+        token = await token_store.get_valid_token()
+        if token:
+            response["quota"] = await LinkedInClient(token).quota()
+    return response
+
+
+async def _post_reply(urn: str, comment: str) -> dict:
+    """Post through the REST API unless the local quota estimate has run out."""
+    client = await _get_client()
+    if not (await client.quota())["remaining"]:
+        raise QuotaExhaustedError("LinkedIn daily quota exhausted")
+    data = await token_store.load_token()
+    return await client.post_comment(
+        post_urn=urn, actor_urn=data["member_urn"], text=comment
     )
+
+
+async def _run_batch(body: BatchReplyRequest, run_id: str, items: list, skipped: list) -> Optional[str]:
+    """Store and append finished items as they complete so a deadline keeps partial work.
+
+    With ``only_new`` the topic's watermark only advances once the whole run
+    completes, so posts a partial run never got to are picked up next time.
+    """
+    # 1. Discover posts
+    results = await _find_posts(body.topic, body.max_posts, body.max_age_hours, body.only_new, "batch")
     if not results:
-        return {"items": [], "message": "No posts found"}
+        return "No posts found"
 
     urls = [r.url for r in results]
     scraped = await scrape_multiple(urls)
 
-    items = []
+    # 2. Triage with the small model so only promising posts reach the generator
+    triage = get_triage_model()
+    if triage.enabled:
+        verdicts = await asyncio.gather(*(triage.score(p.text, body.topic) for p in scraped))
+        kept = []
+        for p, verdict in zip(scraped, verdicts):
+            if verdict.passed:
+                kept.append(p)
+            else:
+                skipped.append({"url": p.url, "score": verdict.score, "reason": verdict.reason})
+        scraped = kept
+
     for p in scraped:
         try:
             urn = extract_activity_urn(p.url)
         except ValueError:
             continue
 
-        # 2. Generate reply
-        replies = await reply_gen.generate_replies(
-            post_text=p.text,
-            num_suggestions=1,
-            tone=body.tone,
-            user_context=body.user_context,
-        )
+        # 3. Generate reply
+        start = time.perf_counter()
+        try:
+            replies = await get_reply_generator().generate_replies(
+                post_text=p.text,
+                num_suggestions=1,
+                tone=body.tone,
+                user_context=body.user_context,
+                priority=BATCH,
+            )
+        except Exception:
+            cascade_stats["generate"].record(time.perf_counter() - start, passed=False, error=True)
+            raise
+        cascade_stats["generate"].record(time.perf_counter() - start)
         comment = replies[0]
 
         item = {
             "url": p.url,
             "urn": urn,
+            "posted_at": activity_timestamp(urn.rsplit(":", 1)[-1]),
             "author": p.author,
             "post_text": p.text[:200],
+            "source_text": p.text,
             "generated_reply": comment,
             "posted": False,
         }
 
-        # 3. Auto-post if enabled
+        # 4. Auto-post if enabled, stopping once the local quota estimate runs out
         if body.auto_post:
             try:
-                client = _get_client()
-                data = token_store.load_token()
-                await client.post_comment(
-                    post_urn=urn, actor_urn=data["member_urn"], text=comment
-                )
+                if expired():
+                    raise DeadlineExceeded("Request deadline exceeded")
+                await _post_reply(urn, comment)
                 item["posted"] = True
+            except DeadlineExceeded:
+                item["error"] = "Deadline exceeded before posting"
+                items.append(await batch_store.append_item(run_id, item))
+                raise
             except Exception as e:
                 item["error"] = str(e)
 
-        items.append(item)
+        items.append(await batch_store.append_item(run_id, item))
+
+    if body.only_new:
+        await _advance_watermark(body.topic, "batch", results)
+    return None
+
+
+@router.get("/runs")
+async def list_runs(request: Request, limit: int = Query(20, ge=1, le=100)):
+    """Recent batch runs, newest first, without their items."""
+    return etag_json(request, {"runs": await batch_store.list_runs(limit)})
+
+
+@router.get("/runs/{run_id}")
+async def get_run(
+    request: Request,
+    run_id: str,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    include_discarded: bool = False,
+):
+    """One page of a run's items; pass ``next_cursor`` back as ``cursor`` for the next."""
+    try:
+        run = await batch_store.get(run_id)
+        page, next_cursor = await batch_store.page(run_id, cursor, limit, include_discarded)
+    except RunNotFound:
+        raise HTTPException(status_code=404, detail="Run not found")
+    meta = {k: v for k, v in run.items() if k != "items"}
+    return etag_json(request, {"run": meta, "items": page, "next_cursor": next_cursor})
+
+
+async def _get_item(run_id: str, item_id: str) -> dict:
+    try:
+        return await batch_store.get_item(run_id, item_id)
+    except RunNotFound:
+        raise HTTPException(status_code=404, detail="Item not found")
+
+
+async def _update_item(run_id: str, item_id: str, expect: set[str], **changes) -> dict:
+    try:
+        return await batch_store.update_item(run_id, item_id, expect=expect, **changes)
+    except RunNotFound:
+        raise HTTPException(status_code=404, detail="Item not found")
+    except ItemConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.post("/runs/{run_id}/items/{item_id}/post")
+async def post_run_item(run_id: str, item_id: str):
+    item = await _get_item(run_id, item_id)
+    if item["status"] == "posted":
+        return {"item": item}
+    # Claim the item first so a second click can't post the same comment
+    item = await _update_item(run_id, item_id, {"ready"}, status="posting")
+    try:
+        await _post_reply(item["urn"], item["generated_reply"])
+    except Exception as e:
+        await batch_store.update_item(run_id, item_id, status="ready", error=str(e))
+        if isinstance(e, HTTPException):
+            raise
+        raise HTTPException(status_code=502, detail=f"LinkedIn API error: {e}")
+    item = await batch_store.update_item(run_id, item_id, posted=True, status="posted", error=None)
+    return {"item": item}
+
+
+@router.post("/runs/{run_id}/items/{item_id}/regenerate")
+async def regenerate_run_item(run_id: str, item_id: str):
+    item = await _get_item(run_id, item_id)
+    if item["status"] not in ("ready", "discarded"):
+        raise HTTPException(status_code=409, detail=f"Item is {item['status']}")
+    run = await batch_store.get(run_id)
+    if run["status"] == "running":
+        raise HTTPException(status_code=409, detail="Run is still running")
+    params = run["params"]
+    replies = await get_reply_generator().generate_replies(
+        post_text=item.get("source_text") or item["post_text"],
+        num_suggestions=1,
+        tone=params.get("tone", "professional"),
+        user_context=params.get("user_context"),
+    )
+    # Re-checked under the lock in case it was posted while generating
+    item = await _update_item(
+        run_id, item_id, {"ready", "discarded"}, generated_reply=replies[0], status="ready"
+    )
+    return {"item": item}
+
+
+@router.post("/runs/{run_id}/items/{item_id}/discard")
+async def discard_run_item(run_id: str, item_id: str):
+    item = await _update_item(run_id, item_id, {"ready", "discarded"}, status="discarded")
+    return {"item": item}
+
+
+@router.get("/cascade-stats")
+async def get_cascade_stats():
+    """Per-tier call counts, pass rates and mean latency for the batch pipeline."""
+    return {tier: stats.as_dict() for tier, stats in cascade_stats.items()}
+
+
+@router.get("/llm-stats")
+async def get_llm_stats():
+    """Model calls in flight, and queue depth and wait time per priority class."""
+    return get_llm_scheduler().stats()
+
+
+@router.get("/search-stats")
+async def get_search_stats():
+    """Per-engine bytes downloaded, fetch and parse time, and hit rate."""
+    return {name: stats.as_dict() for name, stats in engine_stats.items()}
+
 
-    return {"items": items}
+@router.get("/quota")
+async def quota():
+    """Locally estimated LinkedIn API calls left today, for pacing auto-posting."""
+    client = await _get_client()
+    return await client.quota()
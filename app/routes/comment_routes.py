@@ -1,23 +1,27 @@
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
 from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
-from app.ai.reply_generator import ReplyGenerator
+from app.ai.reply_generator import get_reply_generator
 from app.auth.token_store import token_store
+from app.discovery.scraper import scrape_post_text
+from app.linkedin import voyager_http
 from app.linkedin.client import LinkedInClient
 from app.linkedin.url_parser import extract_activity_urn
-from app.linkedin.voyager_client import extract_activity_id, post_comment as voyager_post_comment
+from app.linkedin.voyager_client import extract_activity_id
 
 router = APIRouter(prefix="/api", tags=["comments"])
-reply_gen = ReplyGenerator()
-_executor = ThreadPoolExecutor(max_workers=2)
 
+MAX_ANALYZE_URLS = 100
+# Post pages fetched at once for BATCH_GET misses, across all requests
+SCRAPE_CONCURRENCY = 5
+_scrape_slots = asyncio.Semaphore(SCRAPE_CONCURRENCY)
 
-def _get_client() -> LinkedInClient:
-    token = token_store.get_valid_token()
+
+async def _get_client() -> LinkedInClient:
+    token = await token_store.get_valid_token()
     if not token:
         raise HTTPException(status_code=401, detail="Not authenticated")
     return LinkedInClient(token)
@@ -27,6 +31,10 @@ class AnalyzeRequest(BaseModel):
     url: str
 
 
+class AnalyzeManyRequest(BaseModel):
+    urls: list[str] = Field(max_length=MAX_ANALYZE_URLS)
+
+
 class GenerateRequest(BaseModel):
     post_text: str
     post_urn: str
@@ -47,23 +55,63 @@ async def analyze_post(body: AnalyzeRequest):
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-    client = _get_client()
+    client = await _get_client()
     try:
         post = await client.get_post(urn)
-        text = post.get("commentary", post.get("specificContent", {}).get("com.linkedin.ugc.ShareContent", {}).get("shareCommentary", {}).get("text", ""))
-        author = post.get("author", "")
-        return {"urn": urn, "text": text, "author": author}
+        return {"urn": urn, "text": _post_text(post), "author": post.get("author", "")}
     except Exception:
         # If API can't fetch the post, return URN so user can paste text manually
         return {"urn": urn, "text": "", "author": "", "manual": True}
 
 
+@router.post("/analyze-posts")
+async def analyze_posts(body: AnalyzeManyRequest):
+    """Resolve many post URLs with a few BATCH_GET calls, scraping only the misses."""
+    urls_by_urn: dict[str, str] = {}
+    invalid = []
+    for url in body.urls:
+        try:
+            urn = extract_activity_urn(url)
+        except ValueError:
+            invalid.append(url)
+            continue
+        urls_by_urn.setdefault(urn, url)
+
+    client = await _get_client()
+    fetched = await client.batch_get_posts(list(urls_by_urn))
+
+    misses = [urn for urn in urls_by_urn if not _post_text(fetched.get(urn, {}))]
+    scraped = await asyncio.gather(*(_scrape(urls_by_urn[urn]) for urn in misses))
+    scraped_by_urn = dict(zip(misses, scraped))
+
+    posts = []
+    for urn, url in urls_by_urn.items():
+        if urn in fetched and urn not in scraped_by_urn:
+            post = fetched[urn]
+            posts.append({"url": url, "urn": urn, "text": _post_text(post), "author": post.get("author", "")})
+        elif scraped_by_urn.get(urn):
+            p = scraped_by_urn[urn]
+            posts.append({"url": url, "urn": urn, "text": p.text, "author": p.author})
+        else:
+            posts.append({"url": url, "urn": urn, "text": "", "author": "", "manual": True})
+    return {"posts": posts, "invalid": invalid}
+
+
+async def _scrape(url: str):
+    async with _scrape_slots:
+        return await scrape_post_text(url)
+
+
+def _post_text(post: dict) -> str:
+    return post.get("commentary", post.get("specificContent", {}).get("com.linkedin.ugc.ShareContent", {}).get("shareCommentary", {}).get("text", ""))
+
+
 @router.post("/generate-replies")
 async def generate_replies(body: GenerateRequest):
     if not body.post_text.strip():
         raise HTTPException(status_code=400, detail="Post text is required")
     try:
-        suggestions = await reply_gen.generate_replies(
+        suggestions = await get_reply_generator().generate_replies(
             post_text=body.post_text,
             num_suggestions=body.num_suggestions,
             tone=body.tone,
@@ -78,11 +126,8 @@ async def generate_replies(body: GenerateRequest):
 async def post_comment(body: PostCommentRequest):
     activity_id = extract_activity_id(body.post_urn)
     try:
-        # Run synchronous linkedin_api in thread pool
-        loop = asyncio.get_event_loop()
-        result = await loop.run_in_executor(
-            _executor, voyager_post_comment, activity_id, body.comment_text
-        )
+        # One HTTP request with the browser's session; browser automation as fallback
+        result = await voyager_http.post_comment(activity_id, body.comment_text)
     except Exception as e:
         raise HTTPException(status_code=502, detail=str(e))
     return {"success": True, "result": result}
@@ -0,0 +1,62 @@
+"""Request coalescing for identical in-flight calls.
+
+Concurrent callers that ask for the same key share one underlying call
+instead of each hitting the upstream. Only in-flight work is shared;
+once the call finishes, the next caller starts a fresh one.
+
+The shared call runs without a request deadline, since its callers may
+each have a different one; every caller waits only as long as its own
+deadline allows. Once the last caller has given up, the call is cancelled
+so it doesn't hold e.g. a model slot for work nobody will read.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+
+from app.deadline import DeadlineExceeded, no_deadline, remaining
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls: dict[Hashable, asyncio.Task] = {}
+        self._waiting: dict[asyncio.Task, int] = {}
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: Hashable, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(_without_deadline(fn, *args, **kwargs))
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+        # A cancelled or timed-out caller must not cancel the call others wait on
+        self._waiting[task] = self._waiting.get(task, 0) + 1
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), timeout=remaining(None))
+        except asyncio.TimeoutError:
+            if task.done():
+                raise
+            raise DeadlineExceeded("Request deadline exceeded")
+        finally:
+            self._waiting[task] -= 1
+            if not self._waiting[task]:
+                del self._waiting[task]
+                task.cancel()
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()
+
+
+async def _without_deadline(fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+    # The task has its own copy of the context, so this doesn't leak out
+    with no_deadline():
+        return await fn(*args, **kwargs)
+
+
+def normalize(text: str) -> str:
+    """Case- and whitespace-insensitive key for free-text queries."""
+    return " ".join(text.split()).lower()
@@ -0,0 +1,136 @@
+"""Async JSON file storage.
+
+Disk I/O runs in worker threads so a slow disk never blocks the event loop.
+Writes to the same path are coalesced: while one write is in flight, later
+writes only replace the pending payload, and the latest one wins.
+
+Files may be shared by several worker processes. Writers take an exclusive
+lock on a sidecar ``.lock`` file and replace the target atomically, so
+readers never need a lock and never see a partial file. ``update`` holds
+that lock across a read-modify-write, for changes that must not race with
+another process's.
+"""
+
+import asyncio
+import json
+import logging
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process use only
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+@contextmanager
+def _locked(path: Path):
+    if fcntl is None:
+        yield
+        return
+    with open(path.with_name(f".{path.name}.lock"), "a") as fh:
+        fcntl.flock(fh, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+def _read(path: Path) -> Any:
+    try:
+        return json.loads(path.read_text())
+    except FileNotFoundError:
+        return None
+
+
+def _replace(path: Path, data: Any) -> None:
+    # Caller holds the lock
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(data, indent=2))
+    os.replace(tmp, path)
+
+
+def _write(path: Path, data: Any) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with _locked(path):
+        _replace(path, data)
+
+
+def _update(path: Path, fn: Callable[[Any], Any]) -> Any:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with _locked(path):
+        data = fn(_read(path))
+        _replace(path, data)
+        return data
+
+
+def _delete(path: Path) -> None:
+    if not path.parent.exists():
+        return
+    with _locked(path):
+        path.unlink(missing_ok=True)
+
+
+class JsonStore:
+    def __init__(self):
+        self._pending: dict[Path, Any] = {}
+        self._flushes: dict[Path, asyncio.Task] = {}
+
+    async def read(self, path: Path) -> Any:
+        """Return the JSON stored at ``path`` (or a pending write), or None."""
+        pending = self._pending.get(path, _MISSING)
+        if pending is not _MISSING:
+            return pending
+        return await asyncio.to_thread(_read, path)
+
+    def write(self, path: Path, data: Any) -> asyncio.Task:
+        """Schedule a write; await the returned task to wait until it is on disk."""
+        self._pending[path] = data
+        task = self._flushes.get(path)
+        if task is None:
+            task = asyncio.create_task(self._flush(path))
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            self._flushes[path] = task
+        return task
+
+    async def update(self, path: Path, fn: Callable[[Any], Any]) -> Any:
+        """Atomically replace the data at ``path`` with ``fn(data)`` and return it.
+
+        ``fn`` runs in a thread under the file lock; if it raises, nothing is
+        written and the exception propagates.
+        """
+        task = self._flushes.get(path)
+        if task is not None:
+            await asyncio.gather(task, return_exceptions=True)
+        return await asyncio.to_thread(_update, path, fn)
+
+    async def delete(self, path: Path) -> None:
+        self._pending.pop(path, None)
+        task = self._flushes.get(path)
+        if task is not None:
+            await asyncio.gather(task, return_exceptions=True)
+        await asyncio.to_thread(_delete, path)
+
+    async def _flush(self, path: Path) -> None:
+        try:
+            while path in self._pending:
+                data = self._pending[path]
+                try:
+                    await asyncio.to_thread(_write, path, data)
+                except Exception:
+                    logger.exception(f"Failed to write {path}")
+                    raise
+                finally:
+                    if self._pending.get(path, _MISSING) is data:
+                        del self._pending[path]
+        finally:
+            self._flushes.pop(path, None)
+
+
+json_store = JsonStore()
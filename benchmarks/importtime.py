@@ -0,0 +1,71 @@
+"""Cold-start import time of the FastAPI app.
+
+Usage (from the repository root):
+
+    python -m benchmarks.importtime
+    python -m benchmarks.importtime --runs 10 --top 15 --module app.main
+
+Runs ``python -X importtime -c "import <module>"`` in fresh interpreters,
+reports the median cumulative import time and the slowest modules, and
+flags heavy optional dependencies that got imported eagerly.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+LAZY_MODULES = ("playwright", "bs4", "duckduckgo_search")
+
+
+def measure(module: str) -> dict[str, int]:
+    env = {
+        **os.environ,
+        "LINKEDIN_CLIENT_ID": os.environ.get("LINKEDIN_CLIENT_ID", "bench"),
+        "LINKEDIN_CLIENT_SECRET": os.environ.get("LINKEDIN_CLIENT_SECRET", "bench"),
+    }
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    cumulative = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cum, name = line[len("import time:"):].split("|")
+        cumulative[name.strip()] = int(cum)
+    return cumulative
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--module", default="app.main")
+    p.add_argument("--runs", type=int, default=5)
+    p.add_argument("--top", type=int, default=10)
+    p.add_argument("--max-ms", type=float, help="exit non-zero if the median exceeds this")
+    args = p.parse_args(argv)
+
+    runs = [measure(args.module) for _ in range(args.runs)]
+    totals = [r[args.module] / 1000 for r in runs]
+    median = statistics.median(totals)
+    print(f"{args.module}: median {median:.1f}ms (min {min(totals):.1f}ms, max {max(totals):.1f}ms, {args.runs} runs)")
+
+    last = runs[-1]
+    print(f"\nSlowest {args.top} imports (cumulative, last run):")
+    for name, us in sorted(last.items(), key=lambda kv: kv[1], reverse=True)[:args.top]:
+        print(f"  {us / 1000:8.1f}ms  {name}")
+
+    eager = sorted({n.split(".")[0] for n in last} & set(LAZY_MODULES))
+    if eager:
+        print(f"\nWarning: imported at startup but meant to be lazy: {', '.join(eager)}")
+
+    if args.max_ms is not None and median > args.max_ms:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
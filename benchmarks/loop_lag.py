@@ -0,0 +1,129 @@
+"""Event-loop lag under concurrent cache and token I/O.
+
+Usage (from the repository root):
+
+    python -m benchmarks.loop_lag
+    python -m benchmarks.loop_lag --disk-delay 0.05 --workers 32 --ops 20
+
+A ticker coroutine sleeps in short intervals and records how late it wakes
+up while many coroutines hammer the search cache and token store. The
+``--disk-delay`` flag emulates a slow disk by sleeping inside every file
+operation. ``--mode sync`` performs the same I/O directly on the loop for
+comparison with the thread-offloaded store. tests/test_storage_loop_lag.py
+runs both modes and asserts on the p99 lag.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+TICK = 0.005
+
+
+async def ticker(stop: asyncio.Event, lags: list[float]) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(max(0.0, time.perf_counter() - start - TICK))
+
+
+def slow(fn, delay: float):
+    def wrapper(*args, **kwargs):
+        time.sleep(delay)
+        return fn(*args, **kwargs)
+    return wrapper
+
+
+async def main(args) -> dict:
+    os.environ.setdefault("LINKEDIN_CLIENT_ID", "bench")
+    os.environ.setdefault("LINKEDIN_CLIENT_SECRET", "bench")
+    sys.path.insert(0, str(ROOT))
+
+    from app import storage
+    from app.auth.token_store import TokenStore
+    from app.discovery import search
+
+    # Patched for this run only, so runs in one process (e.g. tests) don't leak
+    originals = (storage._read, storage._write, storage.JsonStore.read, storage.JsonStore.write)
+    try:
+        storage._read = slow(storage._read, args.disk_delay)
+        storage._write = slow(storage._write, args.disk_delay)
+
+        if args.mode == "sync":
+            # Old behaviour: the same file operations, but run on the event loop
+            async def blocking_read(self, path):
+                return storage._read(path)
+
+            def blocking_write(self, path, data):
+                storage._write(path, data)
+                fut = asyncio.get_running_loop().create_future()
+                fut.set_result(None)
+                return fut
+
+            storage.JsonStore.read = blocking_read
+            storage.JsonStore.write = blocking_write
+
+        with tempfile.TemporaryDirectory() as tmp:
+            search.CACHE_DIR = Path(tmp) / "cache"
+            tokens = TokenStore(Path(tmp) / "tokens.json")
+            await tokens.save_token({"access_token": "bench", "expires_in": 3600})
+            posts = [search.PostResult(url=f"https://example.com/{i}", title="t", snippet="s" * 200) for i in range(10)]
+
+            async def worker(w: int):
+                for i in range(args.ops):
+                    query = f"topic {w % 8}"
+                    await search._load_cache(query)
+                    search._save_cache(query, posts)
+                    await tokens.get_valid_token()
+
+            stop = asyncio.Event()
+            lags: list[float] = []
+            tick = asyncio.create_task(ticker(stop, lags))
+            start = time.perf_counter()
+            await asyncio.gather(*(worker(w) for w in range(args.workers)))
+            elapsed = time.perf_counter() - start
+            stop.set()
+            await tick
+            # Let queued cache writes land before the directory goes away
+            await asyncio.gather(*storage.json_store._flushes.values(), return_exceptions=True)
+    finally:
+        storage._read, storage._write, storage.JsonStore.read, storage.JsonStore.write = originals
+
+    lags.sort()
+    result = {
+        "mode": args.mode,
+        "elapsed_s": elapsed,
+        "ticks": len(lags),
+        "lag_mean_ms": statistics.fmean(lags) * 1000 if lags else 0.0,
+        "lag_p99_ms": lags[int(len(lags) * 0.99)] * 1000 if lags else 0.0,
+        "lag_max_ms": lags[-1] * 1000 if lags else 0.0,
+    }
+    print(
+        f"{result['mode']:<6} elapsed={elapsed:.2f}s ticks={result['ticks']} "
+        f"lag mean={result['lag_mean_ms']:.1f}ms p99={result['lag_p99_ms']:.1f}ms "
+        f"max={result['lag_max_ms']:.1f}ms"
+    )
+    return result
+
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--mode", choices=["async", "sync"], default="async")
+    p.add_argument("--workers", type=int, default=16)
+    p.add_argument("--ops", type=int, default=10, help="operations per worker")
+    p.add_argument("--disk-delay", type=float, default=0.02, help="seconds added to each file operation")
+    p.add_argument("--max-lag", type=float, help="exit non-zero if p99 lag exceeds this many ms")
+    return p.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    result = asyncio.run(main(args))
+    if args.max_lag is not None and result["lag_p99_ms"] > args.max_lag:
+        sys.exit(1)
@@ -0,0 +1,256 @@
+"""End-to-end load benchmark against local stub upstreams.
+
+Usage (from the repository root):
+
+    python -m benchmarks.run
+    python -m benchmarks.run --scenarios discover,batch --levels 1,4,16 --requests 64
+    python -m benchmarks.run --ollama-latency 0.8 --search-error-rate 0.2 --json out.json
+
+The app is driven in-process through an ASGI transport; every outbound
+httpx request it makes is rerouted to the stub server from
+``benchmarks.stubs``. RSS is reported for the whole benchmark process.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import httpx
+import uvicorn
+
+from benchmarks.stubs import StubConfig, StubTransport, UpstreamProfile, create_stub_app
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_stub_server(config: StubConfig) -> tuple[str, uvicorn.Server]:
+    port = _free_port()
+    server = uvicorn.Server(
+        uvicorn.Config(create_stub_app(config), host="127.0.0.1", port=port, log_level="warning")
+    )
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}", server
+
+
+def install_stub_transport(stub_url: str) -> None:
+    """Make every httpx.AsyncClient created without an explicit transport hit the stubs."""
+    original = httpx.AsyncClient.__init__
+
+    def patched(self, *args, **kwargs):
+        if "transport" not in kwargs:
+            kwargs["transport"] = StubTransport(stub_url)
+        original(self, *args, **kwargs)
+
+    httpx.AsyncClient.__init__ = patched
+
+
+async def load_app(workdir: Path):
+    os.environ.setdefault("LINKEDIN_CLIENT_ID", "bench")
+    os.environ.setdefault("LINKEDIN_CLIENT_SECRET", "bench")
+    # Measure the app, not the local LinkedIn throttle, unless asked to
+    os.environ.setdefault("LINKEDIN_MEMBER_RPS", "0")
+    os.environ.setdefault("LINKEDIN_APP_RPS", "0")
+    # duckduckgo-search uses its own HTTP client, which the stubs can't intercept
+    os.environ.setdefault("SEARCH_ENGINES", json.dumps(["bing_rss", "ddg_lite", "brave", "yahoo", "ecosia", "startpage"]))
+    os.chdir(ROOT)
+    sys.path.insert(0, str(ROOT))
+
+    from app import batch_store, host_slots
+    from app.auth.token_store import token_store
+    from app.discovery import search, watermarks
+    from app.linkedin import rate_limit, voyager_http
+    from app.main import app
+
+    search.CACHE_DIR = workdir / "cache"
+    batch_store.RUNS_DIR = workdir / "runs"
+    watermarks.WATERMARKS_PATH = workdir / "watermarks.json"
+    host_slots.SLOTS_DIR = workdir / "slots"
+    rate_limit.STATE_PATH = workdir / "rate_limits.json"
+    # Stands in for the session normally exported from the Playwright profile
+    voyager_http.set_session({
+        "cookies": {"li_at": "bench", "JSESSIONID": '"ajax:bench"'},
+        "csrf_token": "ajax:bench",
+    })
+    token_store.path = workdir / "tokens.json"
+    await token_store.save_token({
+        "access_token": "bench-token",
+        "expires_in": 86400,
+        "member_urn": "urn:li:person:bench",
+    })
+    return app
+
+
+def rss_mb() -> float:
+    try:
+        for line in Path("/proc/self/status").read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def scenario_request(name: str, i: int, auto_post: bool) -> tuple[str, dict]:
+    topic = f"bench topic {i}"
+    if name == "discover":
+        return "/api/auto/discover", {"topic": topic, "max_posts": 8}
+    if name == "batch":
+        return "/api/auto/batch", {"topic": topic, "max_posts": 5, "auto_post": auto_post}
+    if name == "analyze":
+        return "/api/analyze-posts", {
+            "urls": [f"https://www.linkedin.com/feed/update/urn:li:activity:{7000000000000000000 + i * 50 + k}/"
+                     for k in range(50)],
+        }
+    if name == "post":
+        return "/api/post-comment", {
+            "post_urn": f"urn:li:activity:{7000000000000000000 + i}",
+            "comment_text": "Sizing on variance instead of conviction is the whole game.",
+        }
+    if name == "generate":
+        return "/api/generate-replies", {
+            "post_text": f"Benchmark post {i}: volatility is not risk, drawdown is.",
+            "post_urn": f"urn:li:activity:{7000000000000000000 + i}",
+            "num_suggestions": 3,
+        }
+    raise ValueError(f"Unknown scenario: {name}")
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[k]
+
+
+async def run_level(client: httpx.AsyncClient, scenario: str, concurrency: int,
+                    total: int, auto_post: bool, identical: bool = False) -> dict:
+    sem = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    errors = 0
+
+    async def one(i: int):
+        nonlocal errors
+        path, body = scenario_request(scenario, 0 if identical else i, auto_post)
+        async with sem:
+            start = time.perf_counter()
+            try:
+                resp = await client.post(path, json=body)
+                if resp.status_code >= 400:
+                    errors += 1
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "scenario": scenario,
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": errors,
+        "throughput_rps": total / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "mean_ms": statistics.fmean(latencies) * 1000 if latencies else 0.0,
+        "rss_mb": rss_mb(),
+    }
+
+
+def print_row(r: dict) -> None:
+    print(
+        f"{r['scenario']:<10} c={r['concurrency']:<4} n={r['requests']:<5} "
+        f"err={r['errors']:<4} {r['throughput_rps']:8.1f} req/s  "
+        f"p50={r['p50_ms']:8.1f}ms p95={r['p95_ms']:8.1f}ms p99={r['p99_ms']:8.1f}ms  "
+        f"rss={r['rss_mb']:.1f}MB"
+    )
+
+
+async def main(args) -> list[dict]:
+    config = StubConfig(
+        search=UpstreamProfile(args.search_latency, args.jitter, args.search_error_rate, 429),
+        linkedin=UpstreamProfile(args.linkedin_latency, args.jitter, args.linkedin_error_rate),
+        ollama=UpstreamProfile(args.ollama_latency, args.jitter, args.ollama_error_rate),
+        posts_per_page=args.posts_per_page,
+    )
+    if args.engines:
+        os.environ["SEARCH_ENGINES"] = json.dumps(args.engines.split(","))
+    if args.triage_model:
+        os.environ["TRIAGE_MODEL"] = args.triage_model
+    stub_url, server = start_stub_server(config)
+    install_stub_transport(stub_url)
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        app = await load_app(Path(tmp))
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            for scenario in args.scenarios.split(","):
+                for level in (int(x) for x in args.levels.split(",")):
+                    result = await run_level(
+                        client, scenario, level, args.requests, args.auto_post, args.identical
+                    )
+                    print_row(result)
+                    results.append(result)
+
+            stats = (await client.get("/api/auto/search-stats")).json()
+            for name, engine in stats.items():
+                if engine["calls"]:
+                    print(
+                        f"engine {name:<10} calls={engine['calls']:<5} hits={engine['hits']:<5} "
+                        f"bytes={engine['mean_bytes'] or 0:9.0f} "
+                        f"parse={(engine['mean_parse_s'] or 0) * 1000:6.2f}ms"
+                    )
+
+    server.should_exit = True
+    return results
+
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--scenarios", default="discover,batch,generate")
+    p.add_argument("--levels", default="1,4,16", help="comma-separated concurrency levels")
+    p.add_argument("--requests", type=int, default=32, help="requests per level")
+    p.add_argument("--auto-post", action="store_true", help="post comments in the batch scenario")
+    p.add_argument("--identical", action="store_true",
+                   help="send the same topic/post in every request to exercise request coalescing")
+    p.add_argument("--posts-per-page", type=int, default=10)
+    p.add_argument("--search-latency", type=float, default=0.05)
+    p.add_argument("--linkedin-latency", type=float, default=0.05)
+    p.add_argument("--ollama-latency", type=float, default=0.2)
+    p.add_argument("--jitter", type=float, default=0.02)
+    p.add_argument("--search-error-rate", type=float, default=0.0)
+    p.add_argument("--linkedin-error-rate", type=float, default=0.0)
+    p.add_argument("--ollama-error-rate", type=float, default=0.0)
+    p.add_argument("--engines", help="comma-separated search engine order, e.g. brave,bing_rss")
+    p.add_argument("--triage-model", help="enable the triage tier with this model name")
+    p.add_argument("--json", help="write results to this file")
+    return p.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    results = asyncio.run(main(args))
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
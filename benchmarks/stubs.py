@@ -0,0 +1,201 @@
+"""Local stub upstreams for benchmarking.
+
+A single ASGI app that emulates everything the service talks to over HTTP:
+search engine result pages (Brave, Yahoo, Ecosia, Startpage), public
+LinkedIn post pages, the LinkedIn REST API and Ollama's /api/chat.
+Outbound httpx traffic is redirected here by ``StubTransport`` so the app
+code runs unmodified.
+"""
+
+import asyncio
+import json
+import random
+import time
+from dataclasses import dataclass, field
+from urllib.parse import quote
+
+import httpx
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import HTMLResponse, JSONResponse
+
+UPSTREAM_HOSTS = {
+    "search.brave.com": "search",
+    "search.yahoo.com": "search",
+    "www.ecosia.org": "search",
+    "www.startpage.com": "search",
+    "www.bing.com": "search",
+    "lite.duckduckgo.com": "search",
+    "www.linkedin.com": "linkedin",
+    "linkedin.com": "linkedin",
+    "api.linkedin.com": "linkedin",
+}
+
+
+@dataclass
+class UpstreamProfile:
+    latency: float = 0.0
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 500
+
+
+@dataclass
+class StubConfig:
+    search: UpstreamProfile = field(default_factory=UpstreamProfile)
+    linkedin: UpstreamProfile = field(default_factory=UpstreamProfile)
+    ollama: UpstreamProfile = field(default_factory=UpstreamProfile)
+    posts_per_page: int = 10
+    post_age: float = 3600.0
+
+
+def _activity_id(age: float) -> str:
+    # Activity IDs carry a millisecond timestamp in the bits above 22
+    ms = int((time.time() - random.uniform(0, age)) * 1000)
+    return str((ms << 22) | random.getrandbits(22))
+
+
+def _post_url(i: int, age: float) -> str:
+    return (
+        f"https://www.linkedin.com/posts/bench-author-{i}_markets-"
+        f"activity-{_activity_id(age)}-{random.randbytes(2).hex()}"
+    )
+
+
+def _search_rss(n: int, age: float) -> str:
+    items = "".join(
+        f"<item><title>Bench author {i} on LinkedIn</title><link>{_post_url(i, age)}</link>"
+        f"<description>Market structure and liquidity notes.</description></item>"
+        for i in range(n)
+    )
+    return f'<?xml version="1.0"?><rss version="2.0"><channel>{items}</channel></rss>'
+
+
+def _search_lite_html(n: int, age: float) -> str:
+    rows = "".join(
+        f'<tr><td><a href="//duckduckgo.com/l/?uddg={quote(_post_url(i, age), safe="")}">'
+        f"Bench author {i} on LinkedIn</a></td></tr>"
+        for i in range(n)
+    )
+    return f"<html><body><table>{rows}</table></body></html>"
+
+
+def _search_html(n: int, age: float) -> str:
+    rows = []
+    for i in range(n):
+        url = _post_url(i, age)
+        rows.append(
+            f'<li class="result"><div><a href="{url}">Bench author {i} on LinkedIn</a>'
+            f"<p>{'Market structure and liquidity notes. ' * 6}</p></div></li>"
+        )
+    script = "<script>" + "var x=1;" * 2000 + "</script>"
+    return f"<html><head>{script}</head><body><ol>{''.join(rows)}</ol></body></html>"
+
+
+def _post_html(slug: str) -> str:
+    text = (
+        "Volatility is not risk. Drawdown you can't sit through is risk. "
+        "Most retail traders size positions on conviction instead of on "
+        "variance, and that is why the same strategy works for one desk "
+        "and blows up another. " * 3
+    )
+    return (
+        "<html><head>"
+        f'<meta property="og:title" content="Bench Author on LinkedIn: {slug[:40]}">'
+        f'<meta property="og:description" content="{text}">'
+        "</head><body></body></html>"
+    )
+
+
+def _ollama_content(body: dict) -> str:
+    system = body.get("messages", [{}])[0].get("content", "")
+    if "Score 0-10" in system:
+        # Triage tier: pass roughly half the posts
+        return json.dumps({"score": random.randint(0, 10), "reason": "bench"})
+    user = body.get("messages", [{}])[-1].get("content", "")
+    n = 3 if "Write 3" in user else 1
+    comments = [
+        f"Sizing on variance instead of conviction is the whole game; option {i + 1} "
+        "is to show the drawdown distribution, not the CAGR."
+        for i in range(n)
+    ]
+    return json.dumps({"comments": comments})
+
+
+def create_stub_app(config: StubConfig) -> FastAPI:
+    app = FastAPI()
+    app.state.config = config
+    app.state.hits = {"search": 0, "linkedin": 0, "ollama": 0}
+
+    async def simulate(kind: str) -> Response | None:
+        profile: UpstreamProfile = getattr(app.state.config, kind)
+        app.state.hits[kind] += 1
+        delay = profile.latency + random.uniform(0, profile.jitter)
+        if delay:
+            await asyncio.sleep(delay)
+        if profile.error_rate and random.random() < profile.error_rate:
+            return Response(status_code=profile.error_status)
+        return None
+
+    @app.api_route("/{path:path}", methods=["GET", "POST"])
+    async def dispatch(path: str, request: Request):
+        host = request.headers.get("x-upstream-host", "")
+        kind = UPSTREAM_HOSTS.get(host, "ollama")
+        err = await simulate(kind)
+        if err is not None:
+            return err
+
+        cfg = app.state.config
+        if kind == "search":
+            if host == "www.bing.com":
+                return Response(_search_rss(cfg.posts_per_page, cfg.post_age), media_type="application/rss+xml")
+            if host == "lite.duckduckgo.com":
+                return HTMLResponse(_search_lite_html(cfg.posts_per_page, cfg.post_age))
+            return HTMLResponse(_search_html(cfg.posts_per_page, cfg.post_age))
+
+        if kind == "linkedin":
+            if path.startswith("voyager/api/"):
+                csrf = request.cookies.get("JSESSIONID", "").strip('"')
+                if not request.cookies.get("li_at") or request.headers.get("csrf-token") != csrf:
+                    return Response(status_code=403)
+                return JSONResponse({"data": {"entityUrn": "urn:li:comment:bench"}}, status_code=201)
+            if path.startswith("posts/"):
+                return HTMLResponse(_post_html(path[len("posts/"):]))
+            if path == "v2/userinfo":
+                return {"sub": "bench-member"}
+            if path.startswith("rest/socialActions/"):
+                return JSONResponse({"id": "bench-comment"}, status_code=201)
+            if path.startswith("rest/posts"):
+                post = {
+                    "author": "urn:li:person:bench",
+                    "commentary": "Volatility is not risk. Drawdown you can't sit through is risk.",
+                }
+                ids = request.query_params.get("ids", "")
+                if ids.startswith("List(") and ids.endswith(")"):
+                    return {"results": {urn: post for urn in ids[5:-1].split(",") if urn}}
+                return post
+            return Response(status_code=404)
+
+        if path == "api/chat":
+            body = await request.json()
+            return {"message": {"role": "assistant", "content": _ollama_content(body)}}
+        return Response(status_code=404)
+
+    return app
+
+
+class StubTransport(httpx.AsyncBaseTransport):
+    """Rewrite every outbound request to the stub server, keeping the host in a header."""
+
+    def __init__(self, stub_url: str):
+        self._stub = httpx.URL(stub_url)
+        self._inner = httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        request.headers["X-Upstream-Host"] = request.url.host
+        request.url = request.url.copy_with(
+            scheme=self._stub.scheme, host=self._stub.host, port=self._stub.port
+        )
+        return await self._inner.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        await self._inner.aclose()
@@ -0,0 +1,30 @@
+"""Event-loop lag while the JSON store is under concurrent, slow disk I/O."""
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.loop_lag import main, parse_args  # noqa: E402
+
+DISK_DELAY = 0.05
+ARGS = ["--workers", "4", "--ops", "3", "--disk-delay", str(DISK_DELAY)]
+
+
+def run(*extra: str) -> dict:
+    return asyncio.run(main(parse_args(ARGS + list(extra))))
+
+
+def test_offloaded_store_keeps_loop_responsive():
+    result = run("--mode", "async")
+    # Every file operation sleeps DISK_DELAY; none of that may land on the loop
+    assert result["ticks"] > 0
+    assert result["lag_p99_ms"] < DISK_DELAY * 1000 / 2
+
+
+def test_offloaded_store_beats_blocking_io():
+    offloaded = run("--mode", "async")
+    blocking = run("--mode", "sync")
+    assert blocking["lag_p99_ms"] >= DISK_DELAY * 1000 * 0.9
+    assert offloaded["lag_p99_ms"] * 4 < blocking["lag_p99_ms"]